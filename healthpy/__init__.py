@@ -1,4 +1,10 @@
 from healthpy._status import status
+from healthpy._aggregation import CheckPolicy, aggregate
+from healthpy._runner import run_checks, run_sync_checks
+from healthpy._cache import cached
+from healthpy._single_flight import single_flight
+from healthpy._scheduler import Scheduler
+from healthpy._circuit_breaker import CircuitBreaker
 from healthpy._response import (
     response_body,
     response_status_code,
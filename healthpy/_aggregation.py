@@ -0,0 +1,81 @@
+from typing import Dict, Tuple
+
+import healthpy
+
+
+class CheckPolicy:
+    """
+    How the status of a check affects the aggregated status.
+    """
+
+    def __init__(self, critical: bool = True, weight: float = 1, group: str = None):
+        """
+        :param critical: A failing critical check makes the aggregated status fail. A failing non-critical check only
+        makes it warn. Default to True.
+        :param weight: Weight of the check within its group. Default to 1.
+        :param group: Name of the group this check belongs to (such as replicas of the same service).
+        The failure of a check within a group does not affect the aggregated status on its own,
+        refer to healthpy.aggregate. Default to None (not part of a group).
+        """
+        self.critical = critical
+        self.weight = weight
+        self.group = group
+
+
+_default_policy = CheckPolicy()
+
+
+def aggregate(
+    results: Dict[str, Tuple[str, dict]],
+    policies: Dict[str, CheckPolicy] = None,
+    groups: Dict[str, float] = None,
+) -> (str, dict):
+    """
+    Aggregate the results of named checks according to the policy of each check, in a single pass over results.
+
+    Without policies, the aggregated status is the same as the one of healthpy.status.
+
+    :param results: Tuple with a string providing the status (amongst healthpy.*_status variable)
+    and the "Checks object" per check name.
+    :param policies: healthpy.CheckPolicy per check name. Default to None (every check is critical).
+    :param groups: Weight of failing checks at which a group is considered as failed, per group name.
+    A group with failing checks below this weight (or with warning checks) is considered as warn.
+    Default to the total weight of the group (a group fails when all its checks fail).
+    :return: A tuple with a string providing the aggregated status (amongst healthpy.*_status variable)
+    and the aggregated "Checks object". Based on https://inadarei.github.io/rfc-healthcheck/
+    """
+    policies = policies or {}
+    groups = groups or {}
+    failed = warned = False
+    # Total and failing weight, and presence of warning checks per group
+    group_weights: Dict[str, list] = {}
+    aggregated_checks = {}
+    for name, (status, checks) in results.items():
+        aggregated_checks.update(checks)
+        policy = policies.get(name, _default_policy)
+        if policy.group is not None:
+            weights = group_weights.setdefault(policy.group, [0, 0, False])
+            weights[0] += policy.weight
+            if status == healthpy.fail_status:
+                weights[1] += policy.weight
+            elif status == healthpy.warn_status:
+                weights[2] = True
+        elif status == healthpy.fail_status:
+            if policy.critical:
+                failed = True
+            else:
+                warned = True
+        elif status == healthpy.warn_status:
+            warned = True
+
+    for group, (total, failing, warning) in group_weights.items():
+        if failing and failing >= groups.get(group, total):
+            failed = True
+        elif failing or warning:
+            warned = True
+
+    if failed:
+        return healthpy.fail_status, aggregated_checks
+    if warned:
+        return healthpy.warn_status, aggregated_checks
+    return healthpy.pass_status, aggregated_checks
@@ -0,0 +1,124 @@
+import asyncio
+import threading
+import time
+import weakref
+from typing import Callable, Optional
+
+from healthpy._runner import _is_async
+
+
+def _aged(checks: dict, age: float) -> dict:
+    age = round(age, 3)
+    return {
+        name: (
+            [{**instance, "cacheAge": age} for instance in check]
+            if isinstance(check, list)
+            else {**check, "cacheAge": age}
+        )
+        for name, check in checks.items()
+    }
+
+
+class _CachedCheck:
+    def __init__(self, check: Callable, ttl: float):
+        self._check = check
+        self._ttl = ttl
+        self._result: Optional[tuple] = None
+        self._exception: Optional[Exception] = None
+        self._stored_at: Optional[float] = None
+        self._refreshing = False
+
+    def _store(self, result: Optional[tuple], exception: Optional[Exception]):
+        self._result, self._exception = result, exception
+        self._stored_at = time.monotonic()
+        self._refreshing = False
+
+    def _is_stale(self) -> bool:
+        return time.monotonic() - self._stored_at >= self._ttl
+
+    def _cached(self, fresh: bool) -> (str, dict):
+        if self._exception:
+            # Each raise would otherwise append frames to the traceback of the stored exception
+            raise self._exception.with_traceback(None)
+        status, checks = self._result
+        if fresh:
+            return status, checks
+        return status, _aged(checks, time.monotonic() - self._stored_at)
+
+
+class _SyncCachedCheck(_CachedCheck):
+    def __init__(self, check: Callable, ttl: float):
+        super().__init__(check, ttl)
+        self._lock = threading.Lock()
+
+    def _perform(self) -> (Optional[tuple], Optional[Exception]):
+        try:
+            return self._check(), None
+        except Exception as e:
+            return None, e
+
+    def _refresh(self):
+        outcome = self._perform()
+        with self._lock:
+            self._store(*outcome)
+
+    def __call__(self) -> (str, dict):
+        with self._lock:
+            fresh = self._stored_at is None
+            if fresh:
+                # Concurrent callers are waiting for this first result
+                self._store(*self._perform())
+            elif self._is_stale() and not self._refreshing:
+                self._refreshing = True
+                threading.Thread(target=self._refresh, daemon=True).start()
+            return self._cached(fresh)
+
+
+class _AsyncCachedCheck(_CachedCheck):
+    def __init__(self, check: Callable, ttl: float):
+        super().__init__(check, ttl)
+        self._refresh_task: Optional[asyncio.Future] = None
+        # Event loop of the previous call (not kept alive)
+        self._loop: Optional[weakref.ReferenceType] = None
+
+    async def _refresh(self):
+        try:
+            result, exception = await self._check(), None
+        except Exception as e:
+            result, exception = None, e
+        self._store(result, exception)
+
+    async def __call__(self) -> (str, dict):
+        loop = asyncio.get_running_loop()
+        # A background refresh would be cancelled with a short-lived event loop (such as asyncio.run per request)
+        long_lived = self._loop is not None and self._loop() is loop
+        self._loop = weakref.ref(loop)
+        fresh = self._stored_at is None or (self._is_stale() and not long_lived)
+        if fresh:
+            await self._refresh()
+        elif self._is_stale() and (
+            self._refresh_task is None or self._refresh_task.done()
+        ):
+            # Rely on the task state, a refresh cancelled (even before it started) must not prevent the next ones
+            self._refresh_task = asyncio.ensure_future(self._refresh())
+        return self._cached(fresh)
+
+
+def cached(check: Callable, ttl: float) -> Callable:
+    """
+    Cache the result of a check (or of a health check) for a given amount of time.
+
+    Once the result is older than ttl, the cached (stale) result is still returned while a single background refresh
+    is performed. Every check provided by a cached result contains a cacheAge key (the age of the result in seconds).
+
+    A coroutine function is only refreshed in background when called within the same event loop as the previous call.
+    Otherwise (such as with asyncio.run per request), a stale result is refreshed before being returned.
+
+    :param check: callable (without parameters) returning a tuple with a string providing the status
+    (amongst healthpy.*_status variable) and the "Checks object". Can be a coroutine function.
+    :param ttl: Number of seconds a result is considered as fresh.
+    :return: A callable of the same kind (coroutine function or not) as check.
+    """
+    if _is_async(check):
+        return _AsyncCachedCheck(check, ttl)
+    return _SyncCachedCheck(check, ttl)
@@ -0,0 +1,121 @@
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import healthpy
+
+closed_state = "closed"
+open_state = "open"
+half_open_state = "half-open"
+
+
+class _Circuit:
+    def __init__(self):
+        self.state = closed_state
+        self.failures = 0
+        self.successful_trials = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+        self.result: Optional[Tuple[str, dict]] = None
+
+
+def _with_state(result: Tuple[str, dict], state: str) -> (str, dict):
+    status, checks = result
+    return status, {
+        name: {**check, "circuitBreaker": state} for name, check in checks.items()
+    }
+
+
+class CircuitBreaker:
+    """
+    Stop performing checks of a service that keeps failing, returning its latest failing result instantly instead.
+
+    A circuit is maintained per service name, so the same instance can be provided to checks of several services.
+
+    Once failure_threshold consecutive checks failed, the circuit is opened: the latest failing result is returned
+    without performing the check for open_duration seconds. The circuit is then half-opened: a single check at a time
+    is performed as a trial (others still receiving the latest failing result). The circuit is closed once
+    trial_probes consecutive trials did not fail, and opened again as soon as a trial fails.
+
+    The state of the circuit (closed, open or half-open) is provided in the circuitBreaker key of the checks.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        open_duration: float = 30,
+        trial_probes: int = 1,
+    ):
+        """
+        :param failure_threshold: Number of consecutive failing checks opening the circuit. Default to 3.
+        :param open_duration: Number of seconds the circuit stays open before allowing trials. Default to 30.
+        :param trial_probes: Number of consecutive trials that must not fail to close the circuit. Default to 1.
+        """
+        self._failure_threshold = failure_threshold
+        self._open_duration = open_duration
+        self._trial_probes = trial_probes
+        self._circuits: Dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def state(self, service_name: str) -> str:
+        """
+        :return: The state of the circuit (closed, open or half-open) of this service.
+        """
+        with self._lock:
+            circuit = self._circuits.get(service_name)
+            return circuit.state if circuit else closed_state
+
+    def _acquire(self, service_name: str) -> Optional[Tuple[str, dict]]:
+        """
+        :return: The latest failing result if the check must not be performed, None otherwise.
+        """
+        with self._lock:
+            circuit = self._circuits.setdefault(service_name, _Circuit())
+            if circuit.state == closed_state:
+                return None
+
+            if (
+                circuit.state == open_state
+                and time.monotonic() - circuit.opened_at >= self._open_duration
+            ):
+                circuit.state = half_open_state
+                circuit.successful_trials = 0
+
+            if circuit.state == half_open_state and not circuit.trial_in_flight:
+                circuit.trial_in_flight = True
+                return None
+
+            return _with_state(circuit.result, circuit.state)
+
+    def _abort(self, service_name: str):
+        """
+        Record that the check was not completed.
+        """
+        with self._lock:
+            self._circuits[service_name].trial_in_flight = False
+
+    def _release(self, service_name: str, result: Tuple[str, dict]) -> (str, dict):
+        """
+        Record the result of a performed check.
+
+        :return: The result with the state of the circuit.
+        """
+        with self._lock:
+            circuit = self._circuits[service_name]
+            trial = circuit.state == half_open_state
+            circuit.trial_in_flight = False
+
+            if result[0] == healthpy.fail_status:
+                circuit.failures += 1
+                if trial or circuit.failures >= self._failure_threshold:
+                    circuit.state = open_state
+                    circuit.opened_at = time.monotonic()
+                    circuit.result = result
+            else:
+                circuit.failures = 0
+                if trial:
+                    circuit.successful_trials += 1
+                    if circuit.successful_trials >= self._trial_probes:
+                        circuit.state = closed_state
+
+            return _with_state(result, circuit.state)
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+def _base_url(url: str) -> str:
+    scheme, netloc, *_ = urlsplit(url)
+    return f"{scheme}://{netloc}"
+
+
+class _Scope:
+    """
+    Clients bound to an event loop.
+
+    They are closed when the event loop shuts down its asynchronous generators (as asyncio.run does before closing
+    it), thanks to an asynchronous generator waiting for this moment.
+    """
+
+    def __init__(self, aclose: Callable[[Any], Awaitable]):
+        self.clients: Dict[Tuple[str, str], Any] = {}
+        self._aclose = aclose
+        self._watcher = self._watch()
+
+    async def _watch(self):
+        try:
+            yield
+        finally:
+            clients, self.clients = list(self.clients.values()), {}
+            for client in clients:
+                await self._aclose(client)
+            # Do not keep the event loop alive (the watcher referencing it)
+            self._watcher = None
+
+    async def start(self):
+        """
+        Register the watcher within the running event loop.
+        """
+        await self._watcher.asend(None)
+
+    async def aclose(self):
+        if self._watcher:
+            await self._watcher.aclose()
+
+    def discard(self):
+        """
+        Forget about clients of an event loop that was closed without shutting down its asynchronous generators.
+        """
+        self.clients = {}
+        if self._watcher:
+            # Complete the watcher without the (closed) event loop
+            try:
+                self._watcher.aclose().send(None)
+            except StopIteration:
+                pass
+
+
+class _Clients:
+    """
+    Keep clients (and their keep-alive connection pools) between checks.
+
+    A client is created once per base URL and client options (and event loop, for asynchronous clients).
+
+    Asynchronous clients are closed when their event loop shuts down (as with asyncio.run per request), and discarded
+    once their event loop is closed.
+    """
+
+    def __init__(
+        self,
+        create: Callable[..., Any],
+        aclose: Optional[Callable[[Any], Awaitable]] = None,
+    ):
+        self._create = create
+        self._aclose = aclose
+        self._clients: Dict[Tuple[str, str], Any] = {}
+        # Asynchronous clients per event loop
+        self._scoped = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _get(self, clients: Dict[Tuple[str, str], Any], url: str, options: dict):
+        key = (_base_url(url), repr(sorted(options.items())))
+        client = clients.get(key)
+        if client is None:
+            client = clients[key] = self._create(**options)
+        return client
+
+    def get(self, url: str, options: dict) -> Any:
+        with self._lock:
+            return self._get(self._clients, url, options)
+
+    async def aget(self, url: str, options: dict) -> Any:
+        """
+        Client bound to the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            for closed in [other for other in self._scoped if other.is_closed()]:
+                self._scoped.pop(closed).discard()
+            scope = self._scoped.get(loop)
+            started = scope is not None
+            if not started:
+                scope = self._scoped[loop] = _Scope(self._aclose)
+            client = self._get(scope.clients, url, options)
+        if not started:
+            await scope.start()
+        return client
+
+    def pop(self) -> List[Any]:
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            return clients
+
+    async def aclose(self):
+        """
+        Close clients bound to the running event loop.
+        """
+        with self._lock:
+            scope = self._scoped.pop(asyncio.get_running_loop(), None)
+        if scope:
+            await scope.aclose()
@@ -1,24 +1,103 @@
+import asyncio
 import datetime
+import json
 import re
-from typing import List, Any, Optional
+import time
+from typing import AsyncIterable, Dict, Iterable, List, Any, Optional
 import warnings
 
 import healthpy
+from healthpy._latency import _elapsed, _measured
 
 
 def _is_json(content_type: Optional[str]) -> bool:
     return re.match(r"application/(health\+)?json", content_type or "") is not None
 
 
+def _bounded(chunks: Iterable[bytes], max_body_size: int) -> (bytes, bool):
+    """
+    Read chunks until max_body_size bytes were read.
+
+    :return: A tuple with the bytes that were read (at most max_body_size) and a boolean indicating if the body was
+    truncated.
+    """
+    body = bytearray()
+    for chunk in chunks:
+        body += chunk
+        if len(body) > max_body_size:
+            return bytes(body[:max_body_size]), True
+    return bytes(body), False
+
+
+async def _async_bounded(
+    chunks: AsyncIterable[bytes], max_body_size: int
+) -> (bytes, bool):
+    body = bytearray()
+    async for chunk in chunks:
+        body += chunk
+        if len(body) > max_body_size:
+            return bytes(body[:max_body_size]), True
+    return bytes(body), False
+
+
+class _TruncatedJson(str):
+    """
+    Text of a JSON body that was truncated (and thus cannot be parsed).
+    """
+
+
+def _bounded_content(
+    body: bytes, truncated: bool, content_type: Optional[str], encoding: Optional[str]
+) -> Any:
+    if not _is_json(content_type):
+        return body.decode(encoding or "utf-8", errors="replace")
+    # A truncated JSON cannot be parsed, status is extracted from the text that was read
+    if truncated:
+        return _TruncatedJson(body.decode(encoding or "utf-8", errors="replace"))
+    return json.loads(body)
+
+
+def _truncated_json_status(text: str) -> Optional[str]:
+    """
+    :return: Value of the top-level status member of a truncated JSON object, if it was fully read.
+    """
+    decoder = json.JSONDecoder()
+    whitespaces = re.compile(r"\s*")
+    index = whitespaces.match(text).end()
+    if not text.startswith("{", index):
+        return None
+
+    separator = "{"
+    try:
+        while text.startswith(separator, index):
+            index = whitespaces.match(text, index + 1).end()
+            name, index = decoder.raw_decode(text, index)
+            index = whitespaces.match(text, index).end()
+            if not text.startswith(":", index):
+                return None
+            index = whitespaces.match(text, index + 1).end()
+            value, index = decoder.raw_decode(text, index)
+            if name == "status":
+                return value if isinstance(value, str) else None
+            index = whitespaces.match(text, index).end()
+            separator = ","
+    except ValueError:  # Member was not fully read
+        return None
+
+
 def _api_health_status(health_response: Any) -> str:
     if isinstance(health_response, dict):
         return health_response.get("status", healthpy.pass_status)
+    if isinstance(health_response, _TruncatedJson):
+        return _truncated_json_status(health_response) or healthpy.pass_status
     return healthpy.pass_status
 
 
 def _api_error_health_status(health_response: Any) -> str:
     if isinstance(health_response, dict):
         return health_response.get("status", healthpy.fail_status)
+    if isinstance(health_response, _TruncatedJson):
+        return _truncated_json_status(health_response) or healthpy.fail_status
     return healthpy.fail_status
 
 
@@ -38,6 +117,9 @@ def _check(
     affected_endpoints: List[str] = None,
     additional_keys: dict = None,
     error_status_extracting: callable = None,
+    circuit_breaker=None,
+    measure_latency: bool = False,
+    latency_threshold: float = None,
     **kwargs,
 ) -> (str, dict):
     """
@@ -52,39 +134,259 @@ def _check(
     Note that the response might be None as this is called to extract the default status in case of failure as well.
     :param affected_endpoints: List of endpoints affected if dependency is down. Default to None.
     :param additional_keys: Additional user defined keys to send in checks.
+    :param circuit_breaker: healthpy.CircuitBreaker instance. Default to None (the check is always performed).
+    :param measure_latency: Provide the number of milliseconds the request took in the latency key. Default to False.
+    :param latency_threshold: Number of milliseconds after which a successful request is considered as warn.
+    Default to None (latency does not affect status).
     :return: A tuple with a string providing the status (amongst healthpy.*_status variable) and the "Checks object".
     Based on https://inadarei.github.io/rfc-healthcheck/
     """
+    if circuit_breaker:
+        rejected = circuit_breaker._acquire(service_name)
+        if rejected:
+            return rejected
+
+    start = time.perf_counter()
     try:
         request = request_class(url, **kwargs)
-        response = request.content()
-        if request.is_error():
-            if not error_status_extracting:
-                error_status_extracting = _api_error_health_status
-
-            if failure_status:
-                warnings.warn(
-                    "failure_status is deprecated and should not be used anymore. Use error_status_extracting instead.",
-                    DeprecationWarning,
-                )
-
-            status = failure_status or error_status_extracting(response)
-            check = {"output": response} if status != healthpy.pass_status else {}
-        else:
-            if not status_extracting:
-                status_extracting = _api_health_status
-
-            status = status_extracting(response)
-            check = {"observedValue": response}
+        status, check = _response_check(
+            request, status_extracting, failure_status, error_status_extracting
+        )
     except Exception as e:
+        status, check = _exception_check(e, failure_status, error_status_extracting)
+
+    result = _measured(
+        _checks(service_name, url, status, check, affected_endpoints, additional_keys),
+        start,
+        measure_latency,
+        latency_threshold,
+    )
+    if circuit_breaker:
+        return circuit_breaker._release(service_name, result)
+    return result
+
+
+async def _async_check(
+    service_name: str,
+    url: str,
+    request_class,
+    status_extracting: callable = None,
+    failure_status: str = None,
+    affected_endpoints: List[str] = None,
+    additional_keys: dict = None,
+    error_status_extracting: callable = None,
+    circuit_breaker=None,
+    measure_latency: bool = False,
+    latency_threshold: float = None,
+    **kwargs,
+) -> (str, dict):
+    """
+    Return Health "Checks object" for an external service connection, without blocking the event loop.
+
+    Parameters are the same as the one of _check, request_class.send being awaited to perform the request.
+    """
+    if circuit_breaker:
+        rejected = circuit_breaker._acquire(service_name)
+        if rejected:
+            return rejected
+
+    start = time.perf_counter()
+    try:
+        request = await request_class.send(url, **kwargs)
+        status, check = _response_check(
+            request, status_extracting, failure_status, error_status_extracting
+        )
+    except Exception as e:
+        status, check = _exception_check(e, failure_status, error_status_extracting)
+    except BaseException:
+        # Cancelled check (timeout), another trial must be allowed
+        if circuit_breaker:
+            circuit_breaker._abort(service_name)
+        raise
+
+    result = _measured(
+        _checks(service_name, url, status, check, affected_endpoints, additional_keys),
+        start,
+        measure_latency,
+        latency_threshold,
+    )
+    if circuit_breaker:
+        return circuit_breaker._release(service_name, result)
+    return result
+
+
+async def _async_check_replicas(
+    service_name: str,
+    urls: List[str],
+    request_class,
+    quorum: int = None,
+    affected_endpoints: List[str] = None,
+    additional_keys: dict = None,
+    **kwargs,
+) -> (str, dict):
+    """
+    Return Health "Checks object" for an external service exposed by several replicas, checked concurrently.
+
+    The service is considered healthy as soon as quorum replicas are not failing, remaining checks being cancelled.
+
+    Other parameters are the same as the one of _async_check, provided to the check of every replica.
+    """
+    quorum = quorum or 1
+    replicas = {}
+    healthy = []
+
+    async def check_replica(url: str) -> (str, dict):
+        start = time.perf_counter()
+        status, checks = await _async_check(service_name, url, request_class, **kwargs)
+        replica = {
+            "status": status,
+            "latency": _elapsed(start),
+        }
+        if "output" in checks[f"{service_name}:health"]:
+            replica["output"] = checks[f"{service_name}:health"]["output"]
+        return url, replica
+
+    tasks = [asyncio.ensure_future(check_replica(url)) for url in urls]
+    try:
+        for next_replica in asyncio.as_completed(tasks):
+            url, replica = await next_replica
+            replicas[url] = replica
+            if replica["status"] != healthpy.fail_status:
+                healthy.append(replica["status"])
+            # Stop as soon as the outcome cannot change anymore
+            if (
+                len(healthy) >= quorum
+                or len(healthy) + len(urls) - len(replicas) < quorum
+            ):
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # Replicas that completed meanwhile are still reported
+    for task in tasks:
+        if not task.cancelled() and task.exception() is None:
+            url, replica = task.result()
+            replicas.setdefault(url, replica)
+
+    check = {
+        "observedValue": {url: replicas.get(url, {"cancelled": True}) for url in urls}
+    }
+    if len(healthy) >= quorum:
+        status = healthpy.status(*healthy)
+    else:
+        status = healthpy.fail_status
+        check["output"] = f"{len(healthy)} healthy replica(s) out of {quorum} required."
+
+    return _checks(
+        service_name, "component", status, check, affected_endpoints, additional_keys
+    )
+
+
+async def _async_check_fleet(
+    services: Dict[str, str],
+    request_class,
+    max_concurrency: int,
+    policies: Optional[dict],
+    groups: Optional[dict],
+    **kwargs,
+) -> (str, dict):
+    """
+    Return Health "Checks object" for several external services, at most max_concurrency being checked at a time.
+
+    Other parameters are the same as the one of _async_check, provided to the check of every service.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def check_service(service_name: str, url: str) -> (str, dict):
+        async with semaphore:
+            return await _async_check(service_name, url, request_class, **kwargs)
+
+    results = await asyncio.gather(
+        *[check_service(service_name, url) for service_name, url in services.items()]
+    )
+    status, checks = healthpy.aggregate(dict(zip(services, results)), policies, groups)
+
+    counts = dict.fromkeys(
+        (healthpy.pass_status, healthpy.warn_status, healthpy.fail_status), 0
+    )
+    for service_status, _ in results:
+        counts[service_status] = counts.get(service_status, 0) + 1
+    checks["fleet:status"] = {
+        "componentType": "system",
+        "status": status,
+        "time": datetime.datetime.utcnow().isoformat(),
+        "observedValue": counts,
+    }
+    return status, checks
+
+
+def _response_check(
+    request,
+    status_extracting: Optional[callable],
+    failure_status: Optional[str],
+    error_status_extracting: Optional[callable],
+) -> (str, dict):
+    response = request.content()
+    status, check = _content_check(
+        request, response, status_extracting, failure_status, error_status_extracting
+    )
+    if request.truncated:
+        check["truncated"] = True
+    return status, check
+
+
+def _content_check(
+    request,
+    response: Any,
+    status_extracting: Optional[callable],
+    failure_status: Optional[str],
+    error_status_extracting: Optional[callable],
+) -> (str, dict):
+    if request.is_error():
+        if not error_status_extracting:
+            error_status_extracting = _api_error_health_status
+
         if failure_status:
             warnings.warn(
                 "failure_status is deprecated and should not be used anymore. Use error_status_extracting instead.",
                 DeprecationWarning,
             )
-        status = failure_status or safe_error_status_extracting(error_status_extracting)
-        check = {"output": str(e)} if status != healthpy.pass_status else {}
 
+        status = failure_status or error_status_extracting(response)
+        return status, ({"output": response} if status != healthpy.pass_status else {})
+
+    if not status_extracting:
+        status_extracting = _api_health_status
+
+    return status_extracting(response), {"observedValue": response}
+
+
+def _exception_check(
+    exception: Exception,
+    failure_status: Optional[str],
+    error_status_extracting: Optional[callable],
+) -> (str, dict):
+    if failure_status:
+        warnings.warn(
+            "failure_status is deprecated and should not be used anymore. Use error_status_extracting instead.",
+            DeprecationWarning,
+        )
+    status = failure_status or safe_error_status_extracting(error_status_extracting)
+    return status, (
+        {"output": str(exception)} if status != healthpy.pass_status else {}
+    )
+
+
+def _checks(
+    service_name: str,
+    url: str,
+    status: str,
+    check: dict,
+    affected_endpoints: Optional[List[str]],
+    additional_keys: Optional[dict],
+) -> (str, dict):
     if affected_endpoints and status != healthpy.pass_status:
         check["affectedEndpoints"] = affected_endpoints
 
@@ -0,0 +1,47 @@
+import time
+
+import healthpy
+
+
+def _elapsed(start: float) -> float:
+    """
+    :param start: Value of time.perf_counter when the probe started.
+    :return: Number of milliseconds elapsed since start.
+    """
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+def _measured(
+    result: (str, dict),
+    start: float,
+    measure_latency: bool,
+    latency_threshold: float,
+) -> (str, dict):
+    """
+    Provide the latency (in milliseconds) of the probe in the latency key of every check.
+    A probe that passed but took more than latency_threshold milliseconds is considered as warn.
+    """
+    if not measure_latency and latency_threshold is None:
+        return result
+
+    latency = _elapsed(start)
+    status, checks = result
+    # Slow but successful probe
+    if (
+        latency_threshold is not None
+        and latency > latency_threshold
+        and status == healthpy.pass_status
+    ):
+        status = healthpy.warn_status
+        checks = {
+            name: {
+                **check,
+                "status": healthpy.warn_status,
+                "output": f"Response took more than {latency_threshold} ms.",
+            }
+            for name, check in checks.items()
+        }
+
+    return status, {
+        name: {**check, "latency": latency} for name, check in checks.items()
+    }
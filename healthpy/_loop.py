@@ -0,0 +1,29 @@
+import asyncio
+import threading
+from typing import Any, Awaitable
+
+
+class _LoopThread:
+    """
+    Event loop running forever in a background (daemon) thread.
+    """
+
+    def __init__(self, name: str):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name=name, daemon=True
+        )
+        self._thread.start()
+
+    def run(self, coroutine: Awaitable) -> Any:
+        """
+        Wait for the coroutine to be performed within the background event loop and return its result.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def stop(self):
+        # As asyncio.run, close asynchronous generators (and clients kept within this event loop)
+        self.run(self._loop.shutdown_asyncgens())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
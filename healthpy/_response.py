@@ -1,6 +1,36 @@
+import hashlib
+import json
+import re
+from typing import Callable, Dict, Optional, Tuple, Union
+
 import healthpy
 
 
+def _json_serializer(body: dict) -> bytes:
+    return json.dumps(body).encode()
+
+
+def _json_etag_serializer(body: dict) -> bytes:
+    return json.dumps(body, default=str).encode()
+
+
+try:
+    import orjson
+
+    def _orjson_serializer(body: dict) -> bytes:
+        return orjson.dumps(body, option=orjson.OPT_NON_STR_KEYS)
+
+    def _orjson_etag_serializer(body: dict) -> bytes:
+        return orjson.dumps(body, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+    _default_serializer = _orjson_serializer
+    # Encoding used to compute ETags when a custom serializer encodes the body (tolerating any value)
+    _etag_serializer = _orjson_etag_serializer
+except ImportError:  # pragma: no cover
+    _default_serializer = _json_serializer
+    _etag_serializer = _json_etag_serializer
+
+
 def response_body(status: str, **kwargs) -> dict:
     """
     Health Check Response Format for HTTP APIs uses the JSON format described in [RFC8259]
@@ -46,6 +76,125 @@ def response_body(status: str, **kwargs) -> dict:
     return body
 
 
+# Encoded members (string or number values) changing on every check even if the health did not change
+_VOLATILE_MEMBERS = re.compile(
+    rb'"(?:time|cacheAge|latency)": ?(?:"(?:[^"\\]|\\.)*"|[-+.\deE]+)'
+)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of the ETag against If-None-Match request header value, as per RFC 7232.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag[2:] if etag.startswith("W/") else etag
+    return any(
+        (tag[2:] if tag.startswith("W/") else tag) == opaque_tag
+        for tag in map(str.strip, if_none_match.split(","))
+    )
+
+
+class _Encoded:
+    """
+    Health check response body with its ETag.
+
+    The details are encoded once to compute the ETag, and the body (only encoded if requested) reuses this encoding
+    unless a custom serializer is used.
+    """
+
+    def __init__(self, response_body: "_ResponseBody", details: dict):
+        self._response_body = response_body
+        self._details = details
+        self._encoded_details = response_body._encode_details(details)
+        self.etag = response_body._etag(self._encoded_details)
+        self._body: Optional[bytes] = None
+
+    @property
+    def body(self) -> bytes:
+        if self._body is None:
+            self._body = self._response_body._encode(
+                self._details, self._encoded_details
+            )
+        return self._body
+
+
+class _ResponseBody:
+    """
+    Encode health check response bodies.
+
+    Static fields (version, releaseId, serviceId, ...) are encoded once (unless a custom serializer is used), and the
+    encoded body of the latest result is reused as long as the same status and checks (the same object, not modified in
+    place) are provided.
+
+    Status-only bodies (without checks nor output) are encoded once per status.
+
+    Every body comes with a weak ETag, computed without volatile keys (such as time) so that it only changes with
+    the health. The ETag is computed once per result, from the same encoding as the body (when using the default
+    serializer).
+    """
+
+    def __init__(
+        self, serializer: Optional[Callable[[dict], Union[bytes, str]]], **kwargs
+    ):
+        self._serializer = serializer
+        static = response_body(None, **kwargs)
+        del static["status"]
+        self._static = static
+        # Encoded members of the static fields (without enclosing braces)
+        self._static_members = _default_serializer(static)[1:-1]
+        self._latest: Optional[Tuple[str, dict, _Encoded]] = None
+        # Encoded status-only bodies per status
+        self._statuses: Dict[str, bytes] = {}
+
+    def _encode_details(self, details: dict) -> bytes:
+        return (_etag_serializer if self._serializer else _default_serializer)(details)
+
+    def _etag(self, encoded_details: bytes) -> str:
+        stable = _VOLATILE_MEMBERS.sub(b"", encoded_details)
+        return f'W/"{hashlib.sha1(stable + self._static_members).hexdigest()}"'
+
+    def _encode(self, body: dict, encoded: bytes = None) -> bytes:
+        # Output of a custom serializer is not guaranteed to end with the closing brace, static fields are not spliced
+        if self._serializer:
+            encoded = self._serializer({**body, **self._static})
+            return encoded.encode() if isinstance(encoded, str) else encoded
+
+        if encoded is None:
+            encoded = _default_serializer(body)
+        if self._static_members:
+            encoded = encoded[:-1] + b"," + self._static_members + b"}"
+        return encoded
+
+    def checks(self, status: str, checks: dict) -> _Encoded:
+        latest = self._latest
+        # Snapshots (such as the ones of healthpy.Scheduler) are provided as the same object until they change
+        if latest and latest[0] == status and latest[1] is checks:
+            return latest[2]
+
+        encoded = _Encoded(self, {"status": status, "checks": checks})
+        self._latest = status, checks, encoded
+        return encoded
+
+    def output(self, status: str, output: str) -> _Encoded:
+        return _Encoded(self, {"status": status, "output": output})
+
+    def status(self, status: str) -> bytes:
+        body = self._statuses.get(status)
+        if body is None:
+            body = self._statuses[status] = self._encode({"status": status})
+        return body
+
+
+def _details_requested(details: Optional[str]) -> bool:
+    """
+    Value of the details query parameter, details are provided unless explicitly disabled.
+    """
+    return (details or "").lower() not in ("false", "0", "no")
+
+
 def response_status_code(status: str) -> int:
     """
     HTTP response code returned by the health endpoint.
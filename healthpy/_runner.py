@@ -0,0 +1,637 @@
+import asyncio
+import concurrent.futures
+import datetime
+import functools
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import healthpy
+from healthpy._aggregation import CheckPolicy, _default_policy, aggregate
+
+# Synchronous checks (requests, redis) are performed within this bounded pool of threads
+_executor = concurrent.futures.ThreadPoolExecutor(thread_name_prefix="healthpy")
+
+
+def _is_async(check: Callable) -> bool:
+    while isinstance(check, functools.partial):
+        check = check.func
+    return asyncio.iscoroutinefunction(check) or asyncio.iscoroutinefunction(
+        getattr(check, "__call__", None)
+    )
+
+
+class _Started:
+    """
+    Synchronous check recording when a thread starts performing it, its timeout not including the time spent waiting
+    for a thread of the executor.
+    """
+
+    def __init__(self, check: Callable, on_start: Callable[[], None] = None):
+        self._check = check
+        self._on_start = on_start
+        self.at: Optional[float] = None
+
+    def __call__(self):
+        self.at = time.monotonic()
+        if self._on_start:
+            self._on_start()
+        return self._check()
+
+
+def _timeout_checks(name: str, timeout: float, status: str = None) -> (str, dict):
+    status = status or healthpy.fail_status
+    return (
+        status,
+        {
+            name: {
+                "status": status,
+                "time": datetime.datetime.utcnow().isoformat(),
+                "output": f"Check did not complete within {timeout} seconds.",
+            }
+        },
+    )
+
+
+def _exception_checks(name: str, exception: Exception) -> (str, dict):
+    return (
+        healthpy.fail_status,
+        {
+            name: {
+                "status": healthpy.fail_status,
+                "time": datetime.datetime.utcnow().isoformat(),
+                "output": str(exception),
+            }
+        },
+    )
+
+
+async def _run_check(
+    name: str,
+    check: Callable,
+    timeout: float,
+    executor: concurrent.futures.Executor,
+    timeout_status: str = None,
+) -> (str, dict):
+    remaining = timeout
+    if _is_async(check):
+        pending_check = check()
+    elif timeout is None:
+        pending_check = asyncio.get_running_loop().run_in_executor(executor, check)
+    else:
+        loop = asyncio.get_running_loop()
+        started = asyncio.Event()
+        check = _Started(
+            check, functools.partial(loop.call_soon_threadsafe, started.set)
+        )
+        pending_check = loop.run_in_executor(executor, check)
+        try:
+            await started.wait()
+        except asyncio.CancelledError:
+            # Do not perform the check if it is still waiting for a thread
+            pending_check.cancel()
+            raise
+        remaining = max(timeout - (time.monotonic() - check.at), 0)
+
+    try:
+        return await asyncio.wait_for(pending_check, remaining)
+    except asyncio.TimeoutError:
+        return _timeout_checks(name, timeout, timeout_status)
+
+
+def _cancelled_checks(name: str, failed: str) -> (str, dict):
+    return (
+        healthpy.warn_status,
+        {
+            name: {
+                "status": healthpy.warn_status,
+                "time": datetime.datetime.utcnow().isoformat(),
+                "output": f"Check was cancelled as {failed} failed.",
+            }
+        },
+    )
+
+
+class _Criticality:
+    """
+    Decide if the failure of a check must stop the remaining ones (fail_fast).
+
+    Without names of critical checks, the policies of checks are used: a failing non-critical check never stops the
+    remaining ones and a failing check within a group only does once the group is considered as failed.
+    """
+
+    def __init__(
+        self,
+        names: Iterable[str],
+        critical: Optional[Iterable[str]],
+        policies: Optional[Dict[str, CheckPolicy]],
+        groups: Optional[Dict[str, float]],
+    ):
+        self._critical = critical
+        self._policies = policies or {}
+        groups = groups or {}
+        totals = {}
+        for name in names:
+            policy = self._policies.get(name, _default_policy)
+            if policy.group is not None:
+                totals[policy.group] = totals.get(policy.group, 0) + policy.weight
+        self._thresholds = {
+            group: groups.get(group, total) for group, total in totals.items()
+        }
+        # Weight of failing checks per group (across waves)
+        self._failing = {group: 0 for group in totals}
+
+    def failure(
+        self,
+        futures: Dict[str, Union[asyncio.Future, concurrent.futures.Future]],
+        done: set,
+    ) -> Optional[str]:
+        """
+        :return: Name of a check that failed (or raised an exception) amongst the completed ones, if critical.
+        """
+        for name, future in futures.items():
+            if future in done and (
+                future.exception() or future.result()[0] == healthpy.fail_status
+            ):
+                if self._critical_failure(name):
+                    return name
+
+    def timeout(self, names: Iterable[str], status: Optional[str]) -> Optional[str]:
+        """
+        :return: Name of a check that timed out amongst the provided ones, if critical (and reported as failed).
+        """
+        if (status or healthpy.fail_status) != healthpy.fail_status:
+            return
+        for name in names:
+            if self._critical_failure(name):
+                return name
+
+    def _critical_failure(self, name: str) -> bool:
+        if self._critical is not None:
+            return name in self._critical
+
+        policy = self._policies.get(name, _default_policy)
+        if policy.group is None:
+            return policy.critical
+        self._failing[policy.group] += policy.weight
+        return self._failing[policy.group] >= self._thresholds[policy.group]
+
+
+async def _wait_fail_fast(
+    tasks: Dict[str, asyncio.Future],
+    deadline: Optional[float],
+    criticality: _Criticality,
+) -> (set, Optional[str]):
+    loop = asyncio.get_running_loop()
+    end = None if deadline is None else loop.time() + deadline
+    pending = set(tasks.values())
+    while pending:
+        remaining = None if end is None else max(end - loop.time(), 0)
+        done, pending = await asyncio.wait(
+            pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+        )
+        if not done:
+            break
+        failed = criticality.failure(tasks, done)
+        if failed:
+            return pending, failed
+    return pending, None
+
+
+def _sync_wait(
+    futures: Dict[str, concurrent.futures.Future],
+    started: Dict[str, _Started],
+    timeout: Optional[float],
+    remaining: Optional[float],
+    timeout_status: Optional[str],
+    criticality: Optional[_Criticality],
+) -> (set, set, Optional[str]):
+    """
+    Wait for checks to complete, the timeout of a check starting once a thread performs it.
+
+    :return: A tuple with the checks that timed out, the checks that did not complete (deadline reached or critical
+    check failed) and the name of the critical check that failed (if fail_fast).
+    """
+    end = None if remaining is None else time.monotonic() + remaining
+    names = {future: name for name, future in futures.items()}
+    timed_out = set()
+    pending = set(futures.values())
+    while pending:
+        now = time.monotonic()
+        if timeout is not None:
+            expired = {
+                future
+                for future in pending
+                if started[names[future]].at is not None
+                and now - started[names[future]].at >= timeout
+                and not future.done()
+            }
+            timed_out |= expired
+            pending -= expired
+            failed = criticality and criticality.timeout(
+                [names[future] for future in expired], timeout_status
+            )
+            if failed:
+                return timed_out, pending, failed
+            if not pending:
+                break
+        if end is not None and now >= end:
+            break
+
+        wake_ups = [] if end is None else [end]
+        if timeout is not None:
+            # A check that did not start yet cannot time out before now + timeout
+            wake_ups.extend(
+                (started[names[future]].at or now) + timeout for future in pending
+            )
+        done, pending = concurrent.futures.wait(
+            pending,
+            timeout=max(min(wake_ups) - now, 0) if wake_ups else None,
+            return_when=concurrent.futures.FIRST_COMPLETED,
+        )
+        failed = criticality and criticality.failure(futures, done)
+        if failed:
+            return timed_out, pending, failed
+    return timed_out, pending, None
+
+
+def _result(
+    name: str,
+    future: Union[asyncio.Future, concurrent.futures.Future],
+    pending: set,
+    failed: Optional[str],
+    delay: float,
+    partial_results: bool,
+    timeout_status: Optional[str],
+) -> (str, dict):
+    if future in pending:
+        if failed:
+            return _cancelled_checks(name, failed)
+        return _timeout_checks(name, delay, timeout_status)
+    if partial_results and future.exception():
+        return _exception_checks(name, future.exception())
+    return future.result()
+
+
+def _waves(
+    names: Iterable[str], dependencies: Dict[str, Iterable[str]]
+) -> List[List[str]]:
+    """
+    Sort checks in topological order, grouping checks that can be performed concurrently.
+    """
+    remaining = {name: set(dependencies.get(name, ())) for name in names}
+    for name, parents in remaining.items():
+        unknown = parents - remaining.keys()
+        if unknown:
+            raise ValueError(
+                f"{name} depends on unknown check(s): {', '.join(unknown)}."
+            )
+
+    waves = []
+    while remaining:
+        wave = [name for name, parents in remaining.items() if not parents]
+        if not wave:
+            raise ValueError(
+                f"Circular dependency between checks: {', '.join(remaining)}."
+            )
+        for name in wave:
+            del remaining[name]
+        for parents in remaining.values():
+            parents.difference_update(wave)
+        waves.append(wave)
+    return waves
+
+
+def _skipped_checks(name: str, status: str, failed: List[str]) -> (str, dict):
+    return (
+        status,
+        {
+            name: {
+                "status": status,
+                "time": datetime.datetime.utcnow().isoformat(),
+                "output": f"Check was skipped as {', '.join(failed)} failed.",
+                "skipped": True,
+            }
+        },
+    )
+
+
+def _effective_status(status: str, policy: CheckPolicy) -> str:
+    """
+    :return: The status a failure of this check contributes to the aggregated status on its own.
+    """
+    if status == healthpy.fail_status and (not policy.critical or policy.group):
+        return healthpy.warn_status
+    return status
+
+
+def _skip_dependents(
+    wave: List[str],
+    checks: Dict[str, Callable],
+    dependencies: Dict[str, Iterable[str]],
+    policies: Optional[Dict[str, CheckPolicy]],
+    results: Dict[str, Tuple[str, dict]],
+    skipped: set,
+) -> Dict[str, Callable]:
+    """
+    Store skipped checks of the wave in results (and their names in skipped).
+    A skipped check is provided with the status its failed dependencies contribute to the aggregated status.
+
+    :return: Checks of the wave that must be performed.
+    """
+    policies = policies or {}
+    to_perform = {}
+    for name in wave:
+        failed = [
+            parent
+            for parent in dependencies.get(name, ())
+            if parent in skipped or results[parent][0] == healthpy.fail_status
+        ]
+        if failed:
+            status = healthpy.status(
+                *[
+                    _effective_status(
+                        results[parent][0], policies.get(parent, _default_policy)
+                    )
+                    for parent in failed
+                ]
+            )
+            results[name] = _skipped_checks(name, status, failed)
+            skipped.add(name)
+        else:
+            to_perform[name] = checks[name]
+    return to_perform
+
+
+def _cancel_waves(
+    waves: List[List[str]], failed: str, results: Dict[str, Tuple[str, dict]]
+):
+    for wave in waves:
+        for name in wave:
+            results[name] = _cancelled_checks(name, failed)
+
+
+async def run_checks(
+    checks: Dict[str, Callable],
+    timeout: float = None,
+    deadline: float = None,
+    executor: concurrent.futures.Executor = None,
+    partial_results: bool = False,
+    timeout_status: str = None,
+    fail_fast: bool = False,
+    critical: Iterable[str] = None,
+    policies: Dict[str, CheckPolicy] = None,
+    groups: Dict[str, float] = None,
+    dependencies: Dict[str, Iterable[str]] = None,
+) -> (str, dict):
+    """
+    Perform checks concurrently and aggregate their results.
+
+    :param checks: Checks to perform per name. Each check is a callable (without parameters) returning a tuple with a
+    string providing the status (amongst healthpy.*_status variable) and the "Checks object".
+    Coroutine functions are awaited, other callables are performed within a pool of threads.
+    Use functools.partial to provide parameters, as in functools.partial(healthpy.httpx.async_check, "petstore", url).
+    :param timeout: Maximum number of seconds a single check can take. Default to None (no timeout).
+    A check taking longer is considered as failed (a check named after it will be provided in the "Checks object").
+    The timeout of a synchronous check starts once a thread performs it (waiting for a thread is not considered).
+    Note that a synchronous check cannot be interrupted and will keep its thread busy until it completes.
+    :param deadline: Maximum number of seconds all checks can take. Default to None (no deadline).
+    asyncio.TimeoutError will be raised if checks are still running after this delay (unless partial_results is set).
+    :param executor: Executor performing synchronous checks. Default to a pool of threads shared by all calls.
+    :param partial_results: Once deadline is reached, cancel checks that are still running and provide the results of
+    completed checks, others being considered as timed out (a check named after them will be provided).
+    A check raising an exception is also considered as failed instead of propagating the exception.
+    Default to False.
+    :param timeout_status: Status of checks that did not complete in time (amongst healthpy.*_status variable).
+    Default to healthpy.fail_status.
+    :param fail_fast: Return as soon as a critical check failed (or raised an exception), cancelling checks that are
+    still running. Cancelled checks are provided with a warn status. Default to False.
+    :param critical: Names of the checks considered by fail_fast. Default to None (criticality is provided by policies,
+    every check being critical without policies).
+    :param policies: healthpy.CheckPolicy per check name, used to aggregate statuses. Refer to healthpy.aggregate.
+    Default to None (every check is critical).
+    :param groups: Weight of failing checks at which a group is considered as failed, per group name.
+    Refer to healthpy.aggregate.
+    :param dependencies: Names of the checks each check depends on, per check name. Checks are performed in waves
+    (checks of a wave being performed concurrently once all their dependencies completed). A check depending on a
+    failed check is not performed (a check with a skipped key is provided). Its status is the one its failed
+    dependencies contribute to the aggregated status (warn for a failed non-critical check or a failed check within a
+    group, fail otherwise). deadline applies to all waves.
+    Default to None (all checks are performed concurrently).
+    :return: A tuple with a string providing the aggregated status (amongst healthpy.*_status variable)
+    and the aggregated "Checks object". Based on https://inadarei.github.io/rfc-healthcheck/
+    """
+    if not checks:
+        return healthpy.pass_status, {}
+
+    perform = functools.partial(
+        _perform,
+        timeout=timeout,
+        deadline=deadline,
+        executor=executor or _executor,
+        partial_results=partial_results,
+        timeout_status=timeout_status,
+        criticality=(
+            _Criticality(checks, critical, policies, groups) if fail_fast else None
+        ),
+    )
+    if not dependencies:
+        results, _ = await perform(checks, remaining=deadline)
+        return aggregate(results, policies, groups)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    results = {}
+    skipped = set()
+    waves = _waves(checks, dependencies)
+    for index, wave in enumerate(waves):
+        to_perform = _skip_dependents(
+            wave, checks, dependencies, policies, results, skipped
+        )
+        remaining = (
+            None if deadline is None else max(deadline - (loop.time() - start), 0)
+        )
+        wave_results, failed = await perform(to_perform, remaining=remaining)
+        results.update(wave_results)
+        if failed:
+            _cancel_waves(waves[index + 1 :], failed, results)
+            break
+
+    return aggregate({name: results[name] for name in checks}, policies, groups)
+
+
+async def _perform(
+    checks: Dict[str, Callable],
+    timeout: Optional[float],
+    deadline: Optional[float],
+    remaining: Optional[float],
+    executor: concurrent.futures.Executor,
+    partial_results: bool,
+    timeout_status: Optional[str],
+    criticality: Optional[_Criticality],
+) -> (Dict[str, Tuple[str, dict]], Optional[str]):
+    """
+    :return: A tuple with the result per check name and the name of the critical check that failed (if fail_fast).
+    """
+    if not checks:
+        return {}, None
+
+    tasks = {
+        name: asyncio.ensure_future(
+            _run_check(name, check, timeout, executor, timeout_status)
+        )
+        for name, check in checks.items()
+    }
+    if criticality:
+        pending, failed = await _wait_fail_fast(tasks, remaining, criticality)
+    else:
+        _, pending = await asyncio.wait(tasks.values(), timeout=remaining)
+        failed = None
+    for task in pending:
+        task.cancel()
+    if pending and not failed and not partial_results:
+        raise asyncio.TimeoutError(
+            f"{len(pending)} check(s) did not complete within {deadline} seconds."
+        )
+
+    return {
+        name: _result(
+            name, task, pending, failed, deadline, partial_results, timeout_status
+        )
+        for name, task in tasks.items()
+    }, failed
+
+
+def run_sync_checks(
+    checks: Dict[str, Callable],
+    timeout: float = None,
+    deadline: float = None,
+    executor: concurrent.futures.Executor = None,
+    partial_results: bool = False,
+    timeout_status: str = None,
+    fail_fast: bool = False,
+    critical: Iterable[str] = None,
+    policies: Dict[str, CheckPolicy] = None,
+    groups: Dict[str, float] = None,
+    dependencies: Dict[str, Iterable[str]] = None,
+) -> (str, dict):
+    """
+    Perform synchronous checks concurrently (within a pool of threads) and aggregate their results.
+    Unlike healthpy.run_checks, no event loop is required.
+
+    :param checks: Checks to perform per name. Each check is a callable (without parameters) returning a tuple with a
+    string providing the status (amongst healthpy.*_status variable) and the "Checks object".
+    Use functools.partial to provide parameters, as in functools.partial(healthpy.requests.check, "petstore", url).
+    :param timeout: Maximum number of seconds a single check can take. Default to None (no timeout).
+    A check taking longer is considered as failed (a check named after it will be provided in the "Checks object").
+    The timeout of a synchronous check starts once a thread performs it (waiting for a thread is not considered).
+    Note that a check cannot be interrupted and will keep its thread busy until it completes.
+    :param deadline: Maximum number of seconds all checks can take. Default to None (no deadline).
+    concurrent.futures.TimeoutError will be raised if checks are still running after this delay
+    (unless partial_results is set).
+    :param executor: Executor performing checks. Default to a pool of threads shared by all calls.
+    :param partial_results: Once deadline is reached, provide the results of completed checks, others being
+    considered as timed out (a check named after them will be provided).
+    A check raising an exception is also considered as failed instead of propagating the exception.
+    Default to False.
+    :param timeout_status: Status of checks that did not complete in time (amongst healthpy.*_status variable).
+    Default to healthpy.fail_status.
+    :param fail_fast: Return as soon as a critical check failed (or raised an exception), cancelling checks that were
+    not started yet. Checks that are not completed are provided with a warn status. Default to False.
+    :param critical: Names of the checks considered by fail_fast. Default to None (criticality is provided by policies,
+    every check being critical without policies).
+    :param policies: healthpy.CheckPolicy per check name, used to aggregate statuses. Refer to healthpy.aggregate.
+    Default to None (every check is critical).
+    :param groups: Weight of failing checks at which a group is considered as failed, per group name.
+    Refer to healthpy.aggregate.
+    :param dependencies: Names of the checks each check depends on, per check name. Checks are performed in waves
+    (checks of a wave being performed concurrently once all their dependencies completed). A check depending on a
+    failed check is not performed (a check with a skipped key is provided). Its status is the one its failed
+    dependencies contribute to the aggregated status (warn for a failed non-critical check or a failed check within a
+    group, fail otherwise). deadline applies to all waves.
+    Default to None (all checks are performed concurrently).
+    :return: A tuple with a string providing the aggregated status (amongst healthpy.*_status variable)
+    and the aggregated "Checks object". Based on https://inadarei.github.io/rfc-healthcheck/
+    """
+    if not checks:
+        return healthpy.pass_status, {}
+
+    perform = functools.partial(
+        _sync_perform,
+        timeout=timeout,
+        deadline=deadline,
+        executor=executor or _executor,
+        partial_results=partial_results,
+        timeout_status=timeout_status,
+        criticality=(
+            _Criticality(checks, critical, policies, groups) if fail_fast else None
+        ),
+    )
+    if not dependencies:
+        results, _ = perform(checks, remaining=deadline)
+        return aggregate(results, policies, groups)
+
+    start = time.monotonic()
+    results = {}
+    skipped = set()
+    waves = _waves(checks, dependencies)
+    for index, wave in enumerate(waves):
+        to_perform = _skip_dependents(
+            wave, checks, dependencies, policies, results, skipped
+        )
+        remaining = (
+            None if deadline is None else max(deadline - (time.monotonic() - start), 0)
+        )
+        wave_results, failed = perform(to_perform, remaining=remaining)
+        results.update(wave_results)
+        if failed:
+            _cancel_waves(waves[index + 1 :], failed, results)
+            break
+
+    return aggregate({name: results[name] for name in checks}, policies, groups)
+
+
+def _sync_perform(
+    checks: Dict[str, Callable],
+    timeout: Optional[float],
+    deadline: Optional[float],
+    remaining: Optional[float],
+    executor: concurrent.futures.Executor,
+    partial_results: bool,
+    timeout_status: Optional[str],
+    criticality: Optional[_Criticality],
+) -> (Dict[str, Tuple[str, dict]], Optional[str]):
+    """
+    :return: A tuple with the result per check name and the name of the critical check that failed (if fail_fast).
+    """
+    if not checks:
+        return {}, None
+
+    started = {name: _Started(check) for name, check in checks.items()}
+    futures = {name: executor.submit(check) for name, check in started.items()}
+    timed_out, pending, failed = _sync_wait(
+        futures, started, timeout, remaining, timeout_status, criticality
+    )
+    # Checks that did not start yet will not be performed
+    for future in pending:
+        future.cancel()
+    if pending and not failed and not partial_results:
+        raise concurrent.futures.TimeoutError(
+            f"{len(pending)} check(s) did not complete within {deadline} seconds."
+        )
+
+    return {
+        name: (
+            _timeout_checks(name, timeout, timeout_status)
+            if future in timed_out
+            else _result(
+                name,
+                future,
+                pending,
+                failed,
+                deadline,
+                partial_results,
+                timeout_status,
+            )
+        )
+        for name, future in futures.items()
+    }, failed
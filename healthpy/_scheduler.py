@@ -0,0 +1,124 @@
+import asyncio
+import concurrent.futures
+from typing import Callable, Dict, List, Optional, Tuple
+
+import healthpy
+from healthpy._loop import _LoopThread
+from healthpy._aggregation import CheckPolicy, aggregate
+from healthpy._runner import _executor, _exception_checks, _run_check
+
+
+class Scheduler:
+    """
+    Perform checks in background, each one on its own interval, and keep the latest aggregated result in memory.
+
+    An instance can be provided as the health_check of an endpoint, the latest result being returned instantly.
+
+    Checks are scheduled within the running event loop (via astart and astop, as in Starlette lifespan events)
+    or within a background thread (via start and stop, as in a Flask application).
+    """
+
+    def __init__(
+        self,
+        executor: concurrent.futures.Executor = None,
+        policies: Dict[str, CheckPolicy] = None,
+        groups: Dict[str, float] = None,
+    ):
+        """
+        :param executor: Executor performing synchronous checks. Default to a pool of threads shared with
+        healthpy.run_checks.
+        :param policies: healthpy.CheckPolicy per check name, used to aggregate statuses. Refer to healthpy.aggregate.
+        Default to None (every check is critical).
+        :param groups: Weight of failing checks at which a group is considered as failed, per group name.
+        Refer to healthpy.aggregate.
+        """
+        self._executor = executor or _executor
+        self._policies = policies
+        self._groups = groups
+        self._checks: Dict[str, Tuple[Callable, float, Optional[float]]] = {}
+        self._results: Dict[str, Tuple[str, dict]] = {}
+        self._snapshot: Optional[Tuple[str, dict]] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop_thread: Optional[_LoopThread] = None
+
+    def add(self, name: str, check: Callable, interval: float, timeout: float = None):
+        """
+        Register a check to be performed in background.
+
+        :param name: Name of the check, used to report failure in case the check raised an exception.
+        :param check: callable (without parameters) returning a tuple with a string providing the status
+        (amongst healthpy.*_status variable) and the "Checks object". Coroutine functions are awaited, other callables
+        are performed within a pool of threads.
+        :param interval: Number of seconds to wait between the end of a check and the start of the next one.
+        :param timeout: Maximum number of seconds the check can take. Default to None (no timeout).
+        """
+        self._checks[name] = check, interval, timeout
+
+    def snapshot(self) -> (str, dict):
+        """
+        :return: A tuple with a string providing the aggregated status (amongst healthpy.*_status variable)
+        and the aggregated "Checks object" of the latest performed checks.
+        """
+        if self._snapshot is None:
+            raise RuntimeError("Checks were not performed yet. Start the scheduler.")
+        return self._snapshot
+
+    async def __call__(self) -> (str, dict):
+        return self.snapshot()
+
+    async def _perform(self, name: str, check: Callable, timeout: Optional[float]):
+        try:
+            self._results[name] = await _run_check(name, check, timeout, self._executor)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._results[name] = _exception_checks(name, e)
+        self._snapshot = aggregate(self._results, self._policies, self._groups)
+
+    async def _schedule(
+        self, name: str, check: Callable, interval: float, timeout: Optional[float]
+    ):
+        while True:
+            await asyncio.sleep(interval)
+            await self._perform(name, check, timeout)
+
+    async def astart(self):
+        """
+        Perform every check once, then schedule them within the running event loop.
+        """
+        await asyncio.gather(
+            *[
+                self._perform(name, check, timeout)
+                for name, (check, _, timeout) in self._checks.items()
+            ]
+        )
+        if not self._checks:
+            self._snapshot = healthpy.pass_status, {}
+        self._tasks = [
+            asyncio.ensure_future(self._schedule(name, *scheduling))
+            for name, scheduling in self._checks.items()
+        ]
+
+    async def astop(self):
+        """
+        Stop scheduling checks within the running event loop.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def start(self):
+        """
+        Perform every check once, then schedule them within a background thread.
+        """
+        self._loop_thread = _LoopThread(name="healthpy-scheduler")
+        self._loop_thread.run(self.astart())
+
+    def stop(self):
+        """
+        Stop scheduling checks within the background thread.
+        """
+        self._loop_thread.run(self.astop())
+        self._loop_thread.stop()
+        self._loop_thread = None
@@ -0,0 +1,37 @@
+import asyncio
+from typing import Callable, Optional
+
+
+class _SingleFlight:
+    def __init__(self, check: Callable):
+        self._check = check
+        self._in_flight: Optional[asyncio.Future] = None
+        # Number of calls that did not perform the check but reused the result of the one in flight
+        self.coalesced = 0
+
+    def _landed(self, in_flight: asyncio.Future):
+        if self._in_flight is in_flight:
+            self._in_flight = None
+
+    async def __call__(self) -> (str, dict):
+        if self._in_flight is None:
+            self._in_flight = asyncio.ensure_future(self._check())
+            self._in_flight.add_done_callback(self._landed)
+        else:
+            self.coalesced += 1
+        # A cancelled caller must not cancel the check awaited by others
+        return await asyncio.shield(self._in_flight)
+
+
+def single_flight(check: Callable) -> Callable:
+    """
+    Share the result of an async check (or of an async health check) amongst concurrent callers.
+
+    Calls received while the check is being performed will not perform it again but wait for the result of the call
+    in flight. The number of such calls is available in the coalesced attribute of the returned callable.
+
+    :param check: coroutine function (without parameters) returning a tuple with a string providing the status
+    (amongst healthpy.*_status variable) and the "Checks object".
+    :return: A coroutine function returning the same results as check.
+    """
+    return _SingleFlight(check)
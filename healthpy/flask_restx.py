@@ -1,21 +1,74 @@
-import json
-from typing import Callable, Union
+import threading
+from typing import Callable, Union, Optional
 import asyncio
 
 import flask_restx
 import flask
 
 import healthpy
+from healthpy._loop import _LoopThread
 from healthpy._response import (
-    response_body,
+    _ResponseBody,
+    _details_requested,
+    _etag_matches,
     consul_response_status_code,
     response_status_code,
 )
+from healthpy._runner import _is_async
+
+# Event loop shared by health endpoints created with persistent_event_loop
+_loop_thread: Optional[_LoopThread] = None
+_loop_thread_lock = threading.Lock()
+
+
+def _persistent_event_loop() -> _LoopThread:
+    global _loop_thread
+    with _loop_thread_lock:
+        if _loop_thread is None:
+            _loop_thread = _LoopThread(name="healthpy-flask-restx")
+        return _loop_thread
+
+
+def close_event_loop(*cleanups: Callable):
+    """
+    Stop the event loop shared by health endpoints created with persistent_event_loop.
+    Should be called when application is shutting down.
+
+    :param cleanups: coroutine functions (without parameters) to await within the event loop before stopping it.
+    Such as healthpy.httpx.aclose to close connections kept between checks.
+    """
+    global _loop_thread
+    with _loop_thread_lock:
+        if _loop_thread is None:
+            return
+        for cleanup in cleanups:
+            _loop_thread.run(cleanup())
+        _loop_thread.stop()
+        _loop_thread = None
+
+
+def _sync_health_check(
+    health_check: Callable, cache_ttl: Optional[float], persistent_event_loop: bool
+) -> Callable:
+    def run_async_health_check() -> (str, dict):
+        if persistent_event_loop:
+            return _persistent_event_loop().run(health_check())
+        return asyncio.run(health_check())
+
+    run_health_check = (
+        run_async_health_check if _is_async(health_check) else health_check
+    )
+    if cache_ttl:
+        return healthpy.cached(run_health_check, cache_ttl)
+    return run_health_check
 
 
 def add_consul_health_endpoint(
     namespace: Union[flask_restx.Namespace, flask_restx.Api],
     health_check: Callable,
+    cache_ttl: float = None,
+    persistent_event_loop: bool = False,
+    serializer: Callable[[dict], Union[bytes, str]] = None,
     **kwargs
 ):
     """
@@ -23,8 +76,16 @@ def add_consul_health_endpoint(
     Consul expected status code (https://www.consul.io/docs/agent/checks.html).
 
     :param namespace: The Flask-RestX namespace.
-    :param health_check: async callable returning a tuple of size 2 with a string providing the status (pass, warn, fail)
+    :param health_check: callable returning a tuple of size 2 with a string providing the status (pass, warn, fail)
     and the "Checks object" as a dictionary as per https://inadarei.github.io/rfc-healthcheck/
+    Coroutine functions are awaited within an event loop, other callables are called directly.
+    :param cache_ttl: (optional) number of seconds the result of health_check will be reused for.
+    Refer to healthpy.cached for more details. Default to None (health_check is called for every request).
+    :param persistent_event_loop: (optional) await health_check within a long-lived event loop (running in a
+    background thread) instead of a new event loop per request. Allowing async clients to be reused between requests.
+    Refer to healthpy.flask_restx.close_event_loop. Default to False.
+    :param serializer: (optional) callable encoding the response body (as a dict) into JSON bytes (or str).
+    Default to orjson (if installed) or the json module.
     :param version: (optional) public version of the service. If not provided, version will be extracted from the
     release_id, considering that release_id is following semantic versioning.
     Version will be considered as the MAJOR component of a MAJOR.MINOR.PATCH release_id.
@@ -43,6 +104,10 @@ def add_consul_health_endpoint(
     :param service_id: (optional) is a unique identifier of the service, in the application scope.
     :param description: (optional) is a human-friendly description of the service.
     """
+    run_health_check = _sync_health_check(
+        health_check, cache_ttl, persistent_event_loop
+    )
+    response_body = _ResponseBody(serializer, **kwargs)
 
     @namespace.route("/health")
     @namespace.doc(
@@ -142,15 +207,32 @@ def add_consul_health_endpoint(
             Check service health.
             This endpoint perform a quick server state check.
             """
+            failure = None
             try:
-                status, checks = asyncio.run(health_check())
-                body = response_body(status, checks=checks, **kwargs)
+                status, checks = run_health_check()
             except Exception as e:
-                status = healthpy.fail_status
-                body = response_body(status, output=str(e), **kwargs)
+                status, failure = healthpy.fail_status, str(e)
+            status_code = consul_response_status_code(status)
+            # Probes only looking at the status code do not need the body to be built
+            if flask.request.method == "HEAD":
+                return flask.Response(status=status_code)
+            if not _details_requested(flask.request.args.get("details")):
+                return flask.Response(
+                    response_body.status(status),
+                    status=status_code,
+                    content_type="application/health+json",
+                )
+
+            if failure is None:
+                encoded = response_body.checks(status, checks)
+            else:
+                encoded = response_body.output(status, failure)
+            if _etag_matches(flask.request.headers.get("If-None-Match"), encoded.etag):
+                return flask.Response(status=304, headers={"ETag": encoded.etag})
             return flask.Response(
-                json.dumps(body),
-                status=consul_response_status_code(status),
+                encoded.body,
+                status=status_code,
+                headers={"ETag": encoded.etag},
                 content_type="application/health+json",
             )
 
@@ -158,14 +240,25 @@ def add_consul_health_endpoint(
 def add_health_endpoint(
     namespace: Union[flask_restx.Namespace, flask_restx.Api],
     health_check: Callable,
+    cache_ttl: float = None,
+    persistent_event_loop: bool = False,
+    serializer: Callable[[dict], Union[bytes, str]] = None,
     **kwargs
 ):
     """
     Create /health: Health check endpoint implementing https://inadarei.github.io/rfc-healthcheck/.
 
     :param namespace: The Flask-RestX namespace.
-    :param health_check: async callable returning a tuple of size 2 with a string providing the status (pass, warn, fail)
+    :param health_check: callable returning a tuple of size 2 with a string providing the status (pass, warn, fail)
     and the "Checks object" as a dictionary as per https://inadarei.github.io/rfc-healthcheck/
+    Coroutine functions are awaited within an event loop, other callables are called directly.
+    :param cache_ttl: (optional) number of seconds the result of health_check will be reused for.
+    Refer to healthpy.cached for more details. Default to None (health_check is called for every request).
+    :param persistent_event_loop: (optional) await health_check within a long-lived event loop (running in a
+    background thread) instead of a new event loop per request. Allowing async clients to be reused between requests.
+    Refer to healthpy.flask_restx.close_event_loop. Default to False.
+    :param serializer: (optional) callable encoding the response body (as a dict) into JSON bytes (or str).
+    Default to orjson (if installed) or the json module.
     :param version: (optional) public version of the service. If not provided, version will be extracted from the
     release_id, considering that release_id is following semantic versioning.
     Version will be considered as the MAJOR component of a MAJOR.MINOR.PATCH release_id.
@@ -184,6 +277,10 @@ def add_health_endpoint(
     :param service_id: (optional) is a unique identifier of the service, in the application scope.
     :param description: (optional) is a human-friendly description of the service.
     """
+    run_health_check = _sync_health_check(
+        health_check, cache_ttl, persistent_event_loop
+    )
+    response_body = _ResponseBody(serializer, **kwargs)
 
     @namespace.route("/health")
     @namespace.doc(
@@ -255,14 +352,31 @@ def add_health_endpoint(
             Check service health.
             This endpoint perform a quick server state check.
             """
+            failure = None
             try:
-                status, checks = asyncio.run(health_check())
-                body = response_body(status, checks=checks, **kwargs)
+                status, checks = run_health_check()
             except Exception as e:
-                status = healthpy.fail_status
-                body = response_body(status, output=str(e), **kwargs)
+                status, failure = healthpy.fail_status, str(e)
+            status_code = response_status_code(status)
+            # Probes only looking at the status code do not need the body to be built
+            if flask.request.method == "HEAD":
+                return flask.Response(status=status_code)
+            if not _details_requested(flask.request.args.get("details")):
+                return flask.Response(
+                    response_body.status(status),
+                    status=status_code,
+                    content_type="application/health+json",
+                )
+
+            if failure is None:
+                encoded = response_body.checks(status, checks)
+            else:
+                encoded = response_body.output(status, failure)
+            if _etag_matches(flask.request.headers.get("If-None-Match"), encoded.etag):
+                return flask.Response(status=304, headers={"ETag": encoded.etag})
             return flask.Response(
-                json.dumps(body),
-                status=response_status_code(status),
+                encoded.body,
+                status=status_code,
+                headers={"ETag": encoded.etag},
                 content_type="application/health+json",
             )
@@ -1,19 +1,62 @@
-from typing import Any, List
+from typing import Any, Dict, List, Optional
 
 import httpx
 
-from healthpy._http import _check, _is_json
+from healthpy._aggregation import CheckPolicy
+from healthpy._circuit_breaker import CircuitBreaker
+from healthpy._clients import _Clients
+from healthpy._http import (
+    _async_bounded,
+    _async_check,
+    _async_check_fleet,
+    _async_check_replicas,
+    _bounded,
+    _bounded_content,
+    _check,
+    _is_json,
+)
+
+_clients = _Clients(httpx.Client)
+_async_clients = _Clients(httpx.AsyncClient, lambda client: client.aclose())
 
 
 class _Request:
-    def __init__(self, url: str, **args):
-        with httpx.Client(timeout=args.pop("timeout", (1, 5)), **args) as client:
+    def __init__(
+        self,
+        url: str,
+        reuse_connections: bool = False,
+        max_body_size: int = None,
+        **args,
+    ):
+        args.setdefault("timeout", (1, 5))
+        self.body, self.truncated = None, False
+        if reuse_connections:
+            self._get(_clients.get(url, args), url, max_body_size)
+        else:
+            with httpx.Client(**args) as client:
+                self._get(client, url, max_body_size)
+
+    def _get(self, client: httpx.Client, url: str, max_body_size: Optional[int]):
+        if max_body_size is None:
             self.response = client.get(url)
+            return
+
+        # Stop reading the body once the limit is reached
+        with client.stream("GET", url) as response:
+            self.response = response
+            self.body, self.truncated = _bounded(response.iter_bytes(), max_body_size)
 
     def is_error(self) -> bool:
         return self.response.is_error
 
     def content(self) -> Any:
+        if self.body is not None:
+            return _bounded_content(
+                self.body,
+                self.truncated,
+                self.response.headers.get("content-type"),
+                self.response.charset_encoding,
+            )
         return (
             self.response.json()
             if _is_json(self.response.headers.get("content-type"))
@@ -21,6 +64,66 @@ class _Request:
         )
 
 
+class _AsyncRequest(_Request):
+    def __init__(
+        self, response: httpx.Response, body: bytes = None, truncated: bool = False
+    ):
+        self.response = response
+        self.body, self.truncated = body, truncated
+
+    @classmethod
+    async def send(
+        cls,
+        url: str,
+        reuse_connections: bool = False,
+        max_body_size: int = None,
+        client: httpx.AsyncClient = None,
+        **args,
+    ) -> "_AsyncRequest":
+        if client:
+            return await cls._get(client, url, max_body_size)
+
+        args.setdefault("timeout", (1, 5))
+        if reuse_connections:
+            # Connections are bound to the event loop they were opened in
+            client = await _async_clients.aget(url, args)
+            return await cls._get(client, url, max_body_size)
+
+        async with httpx.AsyncClient(**args) as client:
+            return await cls._get(client, url, max_body_size)
+
+    @classmethod
+    async def _get(
+        cls, client: httpx.AsyncClient, url: str, max_body_size: Optional[int]
+    ) -> "_AsyncRequest":
+        if max_body_size is None:
+            return cls(await client.get(url))
+
+        # Stop reading the body once the limit is reached
+        async with client.stream("GET", url) as response:
+            body, truncated = await _async_bounded(
+                response.aiter_bytes(), max_body_size
+            )
+            return cls(response, body, truncated)
+
+
+def close():
+    """
+    Close HTTP connections kept by checks performed with reuse_connections.
+    Should be called when application is shutting down.
+    """
+    for client in _clients.pop():
+        client.close()
+
+
+async def aclose():
+    """
+    Close HTTP connections kept by async checks performed with reuse_connections within the running event loop.
+    Should be called when application is shutting down.
+    """
+    await _async_clients.aclose()
+
+
 def check(
     service_name: str,
     url: str,
@@ -29,6 +132,11 @@ def check(
     affected_endpoints: List[str] = None,
     additional_keys: dict = None,
     error_status_extracting: callable = None,
+    reuse_connections: bool = False,
+    circuit_breaker: CircuitBreaker = None,
+    measure_latency: bool = False,
+    latency_threshold: float = None,
+    max_body_size: int = None,
     **httpx_args,
 ) -> (str, dict):
     """
@@ -43,6 +151,16 @@ def check(
     Note that the response might be None as this is called to extract the default status in case of failure as well.
     :param affected_endpoints: List of endpoints affected if dependency is down. Default to None.
     :param additional_keys: Additional user defined keys to send in checks.
+    :param reuse_connections: Keep the httpx.Client (and its connection pool) between checks of the same base URL
+    with the same parameters. Default to False (a new client is created for each check). Refer to healthpy.httpx.close.
+    :param circuit_breaker: healthpy.CircuitBreaker instance returning the latest failing result instantly (without
+    performing the request) while the circuit of this service is open. Default to None (request is always performed).
+    :param measure_latency: Provide the number of milliseconds the request took in the latency key. Default to False.
+    :param latency_threshold: Number of milliseconds after which a successful request is considered as warn
+    (latency being provided as well). Default to None (latency does not affect status).
+    :param max_body_size: Maximum number of bytes to read from the response body, the response being streamed.
+    If the body is larger, the truncated key is provided and the (truncated) body is used as text.
+    Default to None (whole body is read).
     :param httpx_args: All other parameters will be provided to the httpx.Client instance.
     :return: A tuple with a string providing the status (amongst healthpy.*_status variable) and the "Checks object".
     Based on https://inadarei.github.io/rfc-healthcheck/
@@ -56,5 +174,171 @@ def check(
         affected_endpoints=affected_endpoints,
         additional_keys=additional_keys,
         error_status_extracting=error_status_extracting,
+        reuse_connections=reuse_connections,
+        circuit_breaker=circuit_breaker,
+        measure_latency=measure_latency,
+        latency_threshold=latency_threshold,
+        max_body_size=max_body_size,
+        **httpx_args,
+    )
+
+
+async def async_check(
+    service_name: str,
+    url: str,
+    status_extracting: callable = None,
+    failure_status: str = None,
+    affected_endpoints: List[str] = None,
+    additional_keys: dict = None,
+    error_status_extracting: callable = None,
+    reuse_connections: bool = False,
+    circuit_breaker: CircuitBreaker = None,
+    measure_latency: bool = False,
+    latency_threshold: float = None,
+    max_body_size: int = None,
+    **httpx_args,
+) -> (str, dict):
+    """
+    Return Health "Checks object" for an external service connection, without blocking the event loop.
+
+    :param service_name: External service name.
+    :param url: External service health check URL.
+    :param status_extracting: Function returning status according to the JSON or text response (as parameter).
+    Default to the way status should be extracted from a service following healthcheck RFC.
+    :param error_status_extracting: Function returning status according to the JSON or text response (as parameter).
+    Default to the way status should be extracted from a service following healthcheck RFC or fail_status.
+    Note that the response might be None as this is called to extract the default status in case of failure as well.
+    :param affected_endpoints: List of endpoints affected if dependency is down. Default to None.
+    :param additional_keys: Additional user defined keys to send in checks.
+    :param reuse_connections: Keep the httpx.AsyncClient (and its connection pool) between checks of the same base URL
+    with the same parameters, within the same event loop (clients being closed when it shuts down, as with
+    asyncio.run). Default to False (a new client is created for each check). Refer to healthpy.httpx.aclose.
+    :param circuit_breaker: healthpy.CircuitBreaker instance returning the latest failing result instantly (without
+    performing the request) while the circuit of this service is open. Default to None (request is always performed).
+    :param measure_latency: Provide the number of milliseconds the request took in the latency key. Default to False.
+    :param latency_threshold: Number of milliseconds after which a successful request is considered as warn
+    (latency being provided as well). Default to None (latency does not affect status).
+    :param max_body_size: Maximum number of bytes to read from the response body, the response being streamed.
+    If the body is larger, the truncated key is provided and the (truncated) body is used as text.
+    Default to None (whole body is read).
+    :param httpx_args: All other parameters will be provided to the httpx.AsyncClient instance.
+    :return: A tuple with a string providing the status (amongst healthpy.*_status variable) and the "Checks object".
+    Based on https://inadarei.github.io/rfc-healthcheck/
+    """
+    return await _async_check(
+        service_name=service_name,
+        url=url,
+        request_class=_AsyncRequest,
+        status_extracting=status_extracting,
+        failure_status=failure_status,
+        affected_endpoints=affected_endpoints,
+        additional_keys=additional_keys,
+        error_status_extracting=error_status_extracting,
+        reuse_connections=reuse_connections,
+        circuit_breaker=circuit_breaker,
+        measure_latency=measure_latency,
+        latency_threshold=latency_threshold,
+        max_body_size=max_body_size,
         **httpx_args,
     )
+
+
+async def async_check_replicas(
+    service_name: str,
+    urls: List[str],
+    quorum: int = None,
+    status_extracting: callable = None,
+    affected_endpoints: List[str] = None,
+    additional_keys: dict = None,
+    error_status_extracting: callable = None,
+    reuse_connections: bool = False,
+    **httpx_args,
+) -> (str, dict):
+    """
+    Return Health "Checks object" for an external service exposed by several replicas, checked concurrently
+    without blocking the event loop.
+
+    :param service_name: External service name.
+    :param urls: Health check URL of every replica.
+    :param quorum: Number of replicas that must not be failing for the service to be healthy.
+    Checks of other replicas are cancelled as soon as the quorum is reached (or cannot be reached anymore).
+    Default to None, meaning that the first healthy replica wins.
+    :param status_extracting: Function returning status according to the JSON or text response (as parameter).
+    Default to the way status should be extracted from a service following healthcheck RFC.
+    :param error_status_extracting: Function returning status according to the JSON or text response (as parameter).
+    Default to the way status should be extracted from a service following healthcheck RFC or fail_status.
+    Note that the response might be None as this is called to extract the default status in case of failure as well.
+    :param affected_endpoints: List of endpoints affected if dependency is down. Default to None.
+    :param additional_keys: Additional user defined keys to send in checks.
+    :param reuse_connections: Keep the httpx.AsyncClient (and its connection pool) between checks of the same base URL
+    with the same parameters, within the same event loop (clients being closed when it shuts down, as with
+    asyncio.run). Default to False (a new client is created for each check). Refer to healthpy.httpx.aclose.
+    :param httpx_args: All other parameters will be provided to the httpx.AsyncClient instances.
+    :return: A tuple with a string providing the status (amongst healthpy.*_status variable) and the "Checks object".
+    The status and latency (in milliseconds) of every replica is provided in the observedValue key.
+    Based on https://inadarei.github.io/rfc-healthcheck/
+    """
+    return await _async_check_replicas(
+        service_name=service_name,
+        urls=urls,
+        request_class=_AsyncRequest,
+        quorum=quorum,
+        affected_endpoints=affected_endpoints,
+        additional_keys=additional_keys,
+        status_extracting=status_extracting,
+        error_status_extracting=error_status_extracting,
+        reuse_connections=reuse_connections,
+        **httpx_args,
+    )
+
+
+async def async_check_fleet(
+    services: Dict[str, str],
+    max_concurrency: int = 50,
+    status_extracting: callable = None,
+    additional_keys: dict = None,
+    error_status_extracting: callable = None,
+    max_body_size: int = None,
+    policies: Dict[str, CheckPolicy] = None,
+    groups: Dict[str, float] = None,
+    **httpx_args,
+) -> (str, dict):
+    """
+    Return Health "Checks object" for a fleet of external services, checked concurrently without blocking the event
+    loop. Every service is checked as in healthpy.httpx.async_check, using a single pool of connections.
+
+    :param services: Health check URL per service name.
+    :param max_concurrency: Maximum number of services checked (and connections opened) at the same time.
+    Default to 50.
+    :param status_extracting: Function returning status according to the JSON or text response (as parameter).
+    Default to the way status should be extracted from a service following healthcheck RFC.
+    :param error_status_extracting: Function returning status according to the JSON or text response (as parameter).
+    Default to the way status should be extracted from a service following healthcheck RFC or fail_status.
+    Note that the response might be None as this is called to extract the default status in case of failure as well.
+    :param additional_keys: Additional user defined keys to send in checks of every service.
+    :param max_body_size: Maximum number of bytes to read from every response body. Refer to
+    healthpy.httpx.async_check. Default to None (whole body is read).
+    :param policies: healthpy.CheckPolicy per service name, used to aggregate statuses. Refer to healthpy.aggregate.
+    Default to None (every service is critical).
+    :param groups: Weight of failing services at which a group is considered as failed, per group name.
+    Refer to healthpy.aggregate.
+    :param httpx_args: All other parameters will be provided to the httpx.AsyncClient instance.
+    :return: A tuple with a string providing the aggregated status (amongst healthpy.*_status variable) and the
+    "Checks object" of every service. The number of services per status is provided in the fleet:status check.
+    Based on https://inadarei.github.io/rfc-healthcheck/
+    """
+    httpx_args.setdefault("timeout", (1, 5))
+    httpx_args.setdefault("limits", httpx.Limits(max_connections=max_concurrency))
+    async with httpx.AsyncClient(**httpx_args) as client:
+        return await _async_check_fleet(
+            services=services,
+            request_class=_AsyncRequest,
+            max_concurrency=max_concurrency,
+            policies=policies,
+            groups=groups,
+            status_extracting=status_extracting,
+            additional_keys=additional_keys,
+            error_status_extracting=error_status_extracting,
+            max_body_size=max_body_size,
+            client=client,
+        )
@@ -1,63 +1,382 @@
+import time
 from datetime import datetime
+from typing import List, Union
 
 import redis
 
 import healthpy
+from healthpy._clients import _Clients
+from healthpy._latency import _measured
 
 
-def check(url: str, key_pattern: str, additional_keys: dict = None) -> (str, dict):
+def _pool_options(options: dict) -> dict:
+    # Without socket_timeout, keep the default (finite) delay to wait for a connection of a BlockingConnectionPool
+    if "socket_timeout" in options:
+        return {"timeout": options["socket_timeout"], **options}
+    return options
+
+
+def _client(url: str, **options) -> redis.Redis:
+    # A bounded pool waits for a connection to be released instead of failing with "Too many connections"
+    if "max_connections" in options:
+        return redis.Redis(
+            connection_pool=redis.BlockingConnectionPool.from_url(
+                url, **_pool_options(options)
+            )
+        )
+    return redis.Redis.from_url(url, **options)
+
+
+def _async_client(url: str, **options):
+    # redis.asyncio is only available since redis 4.2.0, do not require it for synchronous checks
+    import redis.asyncio
+
+    if "max_connections" in options:
+        return redis.asyncio.Redis(
+            connection_pool=redis.asyncio.BlockingConnectionPool.from_url(
+                url, **_pool_options(options)
+            )
+        )
+    return redis.asyncio.Redis.from_url(url, **options)
+
+
+_clients = _Clients(_client)
+_async_clients = _Clients(
+    _async_client, lambda client: client.connection_pool.disconnect()
+)
+
+
+def close():
+    """
+    Close redis connections kept by checks performed with reuse_connections.
+    Should be called when application is shutting down.
+    """
+    for client in _clients.pop():
+        client.connection_pool.disconnect()
+
+
+async def aclose():
+    """
+    Close redis connections kept by async checks performed with reuse_connections within the running event loop.
+    Should be called when application is shutting down.
+    """
+    await _async_clients.aclose()
+
+
+def _options(max_connections: int, socket_timeout: float) -> dict:
+    options = {}
+    if max_connections:
+        options["max_connections"] = max_connections
+    if socket_timeout:
+        options["socket_timeout"] = socket_timeout
+        options["socket_connect_timeout"] = socket_timeout
+    return options
+
+
+def _redis_server(
+    url: Union[str, redis.Redis, redis.ConnectionPool],
+    reuse_connections: bool,
+    max_connections: int,
+    socket_timeout: float,
+) -> redis.Redis:
+    if isinstance(url, redis.Redis):
+        return url
+    if isinstance(url, redis.ConnectionPool):
+        return redis.Redis(connection_pool=url)
+
+    options = _options(max_connections, socket_timeout)
+    if reuse_connections:
+        return _clients.get(url, {"url": url, **options})
+    return _client(url, **options)
+
+
+async def _async_redis_server(
+    url, reuse_connections: bool, max_connections: int, socket_timeout: float
+):
+    import redis.asyncio
+
+    if isinstance(url, redis.asyncio.Redis):
+        return url
+    if isinstance(url, redis.asyncio.ConnectionPool):
+        return redis.asyncio.Redis(connection_pool=url)
+
+    options = _options(max_connections, socket_timeout)
+    if reuse_connections:
+        # Connections are bound to the event loop they were opened in
+        return await _async_clients.aget(url, {"url": url, **options})
+    return _async_client(url, **options)
+
+
+def _checks(status: str, additional_keys: dict, **check) -> (str, dict):
+    return (
+        status,
+        {
+            "redis:ping": {
+                "componentType": "component",
+                "status": status,
+                "time": datetime.utcnow().isoformat(),
+                **check,
+                **additional_keys,
+            }
+        },
+    )
+
+
+def _scan_result(key_pattern: str, found: bool, calls: int, additional_keys: dict):
+    if not found:
+        return _checks(
+            healthpy.fail_status,
+            additional_keys,
+            output=f"{key_pattern} cannot be found.",
+            scanCalls=calls,
+        )
+
+    return _checks(
+        healthpy.pass_status,
+        additional_keys,
+        observedValue=f"{key_pattern} can be found.",
+        scanCalls=calls,
+    )
+
+
+def _keys_result(key_pattern: str, keys, additional_keys: dict):
+    if not keys or not isinstance(keys, list):
+        return _checks(
+            healthpy.fail_status,
+            additional_keys,
+            output=f"{key_pattern} cannot be found in {keys}",
+        )
+
+    return _checks(
+        healthpy.pass_status,
+        additional_keys,
+        observedValue=f"{key_pattern} can be found.",
+    )
+
+
+def _scan(redis_server: redis.Redis, key_pattern: str, count: int) -> (bool, int):
+    """
+    Look for a key matching the pattern, stopping as soon as one is found.
+
+    :return: A tuple with a boolean indicating if a key was found and the number of SCAN calls performed.
+    """
+    cursor, calls = 0, 0
+    while True:
+        cursor, keys = redis_server.scan(cursor, match=key_pattern, count=count)
+        calls += 1
+        if keys:
+            return True, calls
+        if not cursor:
+            return False, calls
+
+
+def check(
+    url: Union[str, redis.Redis, redis.ConnectionPool],
+    key_pattern: str,
+    additional_keys: dict = None,
+    scan_count: int = None,
+    reuse_connections: bool = False,
+    max_connections: int = None,
+    socket_timeout: float = None,
+    measure_latency: bool = False,
+    latency_threshold: float = None,
+) -> (str, dict):
     """
     Return Health "Checks object" for redis keys.
 
-    :param url: Redis URL
+    :param url: Redis URL. Can also be an existing redis.Redis client or redis.ConnectionPool.
     :param key_pattern: Pattern to look for in keys.
     :param additional_keys: Additional user defined keys to send in checks.
+    :param scan_count: Number of keys to look into per SCAN call. Default to None, meaning that KEYS will be used.
+    KEYS blocks the redis server while looking into the whole keyspace, while SCAN iterates over the keyspace
+    (a few keys at a time) and stops as soon as a matching key is found.
+    The number of SCAN calls will be provided in the scanCalls key.
+    :param reuse_connections: Keep the client (and its connection pool) between checks of the same URL with the same
+    parameters. Default to False (a new client is created for each check). Refer to healthpy.redis.close.
+    :param max_connections: Maximum number of connections in the connection pool. Default to None (unbounded).
+    Once reached, checks wait (up to socket_timeout, 20 seconds by default) for a connection to be released.
+    :param socket_timeout: Number of seconds to wait when connecting or waiting for a response.
+    Default to None (no timeout).
+    :param measure_latency: Provide the number of milliseconds the commands took in the latency key. Default to False.
+    :param latency_threshold: Number of milliseconds after which successful commands are considered as warn
+    (latency being provided as well). Default to None (latency does not affect status).
     :return: A tuple with a string providing the status (amongst healthpy.*_status variable) and the "Checks object".
     Based on https://inadarei.github.io/rfc-healthcheck/
     """
     additional_keys = additional_keys or {}
+    start = time.perf_counter()
     try:
-        redis_server = redis.Redis.from_url(url)
+        redis_server = _redis_server(
+            url, reuse_connections, max_connections, socket_timeout
+        )
         redis_server.ping()
 
-        keys = redis_server.keys(key_pattern)
+        if scan_count:
+            found, calls = _scan(redis_server, key_pattern, scan_count)
+            result = _scan_result(key_pattern, found, calls, additional_keys)
+        else:
+            result = _keys_result(
+                key_pattern, redis_server.keys(key_pattern), additional_keys
+            )
+    except Exception as e:
+        result = _checks(healthpy.fail_status, additional_keys, output=str(e))
+    return _measured(result, start, measure_latency, latency_threshold)
+
+
+def check_keys(
+    url: Union[str, redis.Redis, redis.ConnectionPool],
+    keys: List[str] = None,
+    key_patterns: List[str] = None,
+    additional_keys: dict = None,
+    scan_count: int = 1000,
+    reuse_connections: bool = False,
+    max_connections: int = None,
+    socket_timeout: float = None,
+    measure_latency: bool = False,
+    latency_threshold: float = None,
+) -> (str, dict):
+    """
+    Return Health "Checks object" for several redis keys, pipelining commands to limit the number of round trips.
+
+    Existing keys are looked for using EXISTS while patterns are looked for using SCAN (stopping at the first match),
+    all within a single pipeline. Additional pipelines are only sent for patterns that need more SCAN iterations.
+
+    :param url: Redis URL. Can also be an existing redis.Redis client or redis.ConnectionPool.
+    :param keys: Exact keys that must exist.
+    :param key_patterns: Patterns that must match at least one key.
+    :param additional_keys: Additional user defined keys to send in checks.
+    :param scan_count: Number of keys to look into per SCAN call. Default to 1000.
+    :param reuse_connections: Keep the client (and its connection pool) between checks of the same URL with the same
+    parameters. Default to False (a new client is created for each check). Refer to healthpy.redis.close.
+    :param max_connections: Maximum number of connections in the connection pool. Default to None (unbounded).
+    Once reached, checks wait (up to socket_timeout, 20 seconds by default) for a connection to be released.
+    :param socket_timeout: Number of seconds to wait when connecting or waiting for a response.
+    Default to None (no timeout).
+    :param measure_latency: Provide the number of milliseconds the commands took in the latency key. Default to False.
+    :param latency_threshold: Number of milliseconds after which successful commands are considered as warn
+    (latency being provided as well). Default to None (latency does not affect status).
+    :return: A tuple with a string providing the status (amongst healthpy.*_status variable) and the "Checks object".
+    The status of every key and pattern is provided in the observedValue key.
+    Based on https://inadarei.github.io/rfc-healthcheck/
+    """
+    keys = keys or []
+    key_patterns = key_patterns or []
+    additional_keys = additional_keys or {}
+    start = time.perf_counter()
+    try:
+        redis_server = _redis_server(
+            url, reuse_connections, max_connections, socket_timeout
+        )
+        pipeline = redis_server.pipeline(transaction=False)
+        pipeline.ping()
+        for key in keys:
+            pipeline.exists(key)
+        for key_pattern in key_patterns:
+            pipeline.scan(0, match=key_pattern, count=scan_count)
+        _, *results = pipeline.execute()
 
-        if not keys or not isinstance(keys, list):
-            return (
+        found = {key: bool(exists) for key, exists in zip(keys, results)}
+        cursors = {}
+        scans = zip(key_patterns, results[len(keys) :])
+        while True:
+            for key_pattern, (cursor, matching_keys) in scans:
+                found[key_pattern] = bool(matching_keys)
+                if not matching_keys and cursor:
+                    cursors[key_pattern] = cursor
+            if not cursors:
+                break
+
+            pipeline = redis_server.pipeline(transaction=False)
+            for key_pattern, cursor in cursors.items():
+                pipeline.scan(cursor, match=key_pattern, count=scan_count)
+            scans = list(zip(cursors, pipeline.execute()))
+            cursors = {}
+
+        observed = {
+            key: healthpy.pass_status if is_found else healthpy.fail_status
+            for key, is_found in found.items()
+        }
+        missing = [key for key, is_found in found.items() if not is_found]
+        if missing:
+            result = _checks(
                 healthpy.fail_status,
-                {
-                    "redis:ping": {
-                        "componentType": "component",
-                        "status": healthpy.fail_status,
-                        "time": datetime.utcnow().isoformat(),
-                        "output": f"{key_pattern} cannot be found in {keys}",
-                        **additional_keys,
-                    }
-                },
+                additional_keys,
+                observedValue=observed,
+                output=f"{', '.join(missing)} cannot be found.",
+            )
+        else:
+            result = _checks(
+                healthpy.pass_status, additional_keys, observedValue=observed
             )
+    except Exception as e:
+        result = _checks(healthpy.fail_status, additional_keys, output=str(e))
+    return _measured(result, start, measure_latency, latency_threshold)
+
+
+async def _async_scan(redis_server, key_pattern: str, count: int) -> (bool, int):
+    cursor, calls = 0, 0
+    while True:
+        cursor, keys = await redis_server.scan(cursor, match=key_pattern, count=count)
+        calls += 1
+        if keys:
+            return True, calls
+        if not cursor:
+            return False, calls
+
+
+async def async_check(
+    url,
+    key_pattern: str,
+    additional_keys: dict = None,
+    scan_count: int = None,
+    reuse_connections: bool = False,
+    max_connections: int = None,
+    socket_timeout: float = None,
+    measure_latency: bool = False,
+    latency_threshold: float = None,
+) -> (str, dict):
+    """
+    Return Health "Checks object" for redis keys, without blocking the event loop.
+
+    Note: redis 4.2.0 (at least) must be installed.
 
-        return (
-            healthpy.pass_status,
-            {
-                "redis:ping": {
-                    "componentType": "component",
-                    "observedValue": f"{key_pattern} can be found.",
-                    "status": healthpy.pass_status,
-                    "time": datetime.utcnow().isoformat(),
-                    **additional_keys,
-                }
-            },
+    :param url: Redis URL. Can also be an existing redis.asyncio.Redis client or redis.asyncio.ConnectionPool.
+    :param key_pattern: Pattern to look for in keys.
+    :param additional_keys: Additional user defined keys to send in checks.
+    :param scan_count: Number of keys to look into per SCAN call. Default to None, meaning that KEYS will be used.
+    Refer to healthpy.redis.check for more details.
+    :param reuse_connections: Keep the client (and its connection pool) between checks of the same URL with the same
+    parameters, within the same event loop (clients being closed when it shuts down, as with asyncio.run).
+    Default to False (a new client is created for each check). Refer to healthpy.redis.aclose.
+    :param max_connections: Maximum number of connections in the connection pool. Default to None (unbounded).
+    Once reached, checks wait (up to socket_timeout, 20 seconds by default) for a connection to be released.
+    :param socket_timeout: Number of seconds to wait when connecting or waiting for a response.
+    Default to None (no timeout).
+    :param measure_latency: Provide the number of milliseconds the commands took in the latency key. Default to False.
+    :param latency_threshold: Number of milliseconds after which successful commands are considered as warn
+    (latency being provided as well). Default to None (latency does not affect status).
+    :return: A tuple with a string providing the status (amongst healthpy.*_status variable) and the "Checks object".
+    Based on https://inadarei.github.io/rfc-healthcheck/
+    """
+    additional_keys = additional_keys or {}
+    start = time.perf_counter()
+    try:
+        redis_server = await _async_redis_server(
+            url, reuse_connections, max_connections, socket_timeout
         )
+        try:
+            await redis_server.ping()
+
+            if scan_count:
+                found, calls = await _async_scan(redis_server, key_pattern, scan_count)
+                result = _scan_result(key_pattern, found, calls, additional_keys)
+            else:
+                result = _keys_result(
+                    key_pattern, await redis_server.keys(key_pattern), additional_keys
+                )
+        finally:
+            if isinstance(url, str) and not reuse_connections:
+                await redis_server.connection_pool.disconnect()
     except Exception as e:
-        return (
-            healthpy.fail_status,
-            {
-                "redis:ping": {
-                    "componentType": "component",
-                    "status": healthpy.fail_status,
-                    "time": datetime.utcnow().isoformat(),
-                    "output": str(e),
-                    **additional_keys,
-                }
-            },
-        )
+        result = _checks(healthpy.fail_status, additional_keys, output=str(e))
+    return _measured(result, start, measure_latency, latency_threshold)
@@ -1,21 +1,59 @@
-from typing import Any, List
+from typing import Any, List, Optional
 
 import requests
 
-from healthpy._http import _check, _is_json
+from healthpy._circuit_breaker import CircuitBreaker
+from healthpy._clients import _Clients
+from healthpy._http import _bounded, _bounded_content, _check, _is_json
+
+_sessions = _Clients(requests.Session)
 
 
 class _Request:
-    def __init__(self, url: str, **args):
-        with requests.Session() as session:
-            self.response = session.get(
-                url, timeout=args.pop("timeout", (1, 5)), **args
+    def __init__(
+        self,
+        url: str,
+        reuse_connections: bool = False,
+        max_body_size: int = None,
+        **args,
+    ):
+        args.setdefault("timeout", (1, 5))
+        self.body, self.truncated = None, False
+        if reuse_connections:
+            self._get(_sessions.get(url, {}), url, max_body_size, args)
+        else:
+            with requests.Session() as session:
+                self._get(session, url, max_body_size, args)
+
+    def _get(
+        self,
+        session: requests.Session,
+        url: str,
+        max_body_size: Optional[int],
+        args: dict,
+    ):
+        if max_body_size is None:
+            self.response = session.get(url, **args)
+            return
+
+        # Stop reading the body once the limit is reached
+        with session.get(url, stream=True, **args) as response:
+            self.response = response
+            self.body, self.truncated = _bounded(
+                response.iter_content(chunk_size=1024), max_body_size
             )
 
     def is_error(self) -> bool:
         return not self.response.ok
 
     def content(self) -> Any:
+        if self.body is not None:
+            return _bounded_content(
+                self.body,
+                self.truncated,
+                self.response.headers.get("content-type"),
+                self.response.encoding,
+            )
         return (
             self.response.json()
             if _is_json(self.response.headers["content-type"])
@@ -23,6 +61,15 @@ class _Request:
         )
 
 
+def close():
+    """
+    Close HTTP connections kept by checks performed with reuse_connections.
+    Should be called when application is shutting down.
+    """
+    for session in _sessions.pop():
+        session.close()
+
+
 def check(
     service_name: str,
     url: str,
@@ -31,6 +78,11 @@ def check(
     affected_endpoints: List[str] = None,
     additional_keys: dict = None,
     error_status_extracting: callable = None,
+    reuse_connections: bool = False,
+    circuit_breaker: CircuitBreaker = None,
+    measure_latency: bool = False,
+    latency_threshold: float = None,
+    max_body_size: int = None,
     **requests_args,
 ) -> (str, dict):
     """
@@ -45,6 +97,17 @@ def check(
     Note that the response might be None as this is called to extract the default status in case of failure as well.
     :param affected_endpoints: List of endpoints affected if dependency is down. Default to None.
     :param additional_keys: Additional user defined keys to send in checks.
+    :param reuse_connections: Keep the requests.Session (and its connection pool) between checks of the same base URL.
+    Default to False (a new session is created for each check). Refer to healthpy.requests.close.
+    :param circuit_breaker: healthpy.CircuitBreaker instance returning the latest failing result instantly (without
+    performing the request) while the circuit of this service is open. Default to None (request is always performed).
+    :param measure_latency: Provide the number of milliseconds the request took in the latency key. Default to False.
+    :param latency_threshold: Number of milliseconds after which a successful request is considered as warn
+    (latency being provided as well). Default to None (latency does not affect status).
+    :param max_body_size: Maximum number of bytes to read from the response body, the response being streamed.
+    If the body is larger, the truncated key is provided and the (truncated) body is used as text.
+    Default to None (whole body is read).
+    :param requests_args: All other parameters will be provided to the requests.Session.get method.
     :return: A tuple with a string providing the status (amongst healthpy.*_status variable) and the "Checks object".
     Based on https://inadarei.github.io/rfc-healthcheck/
     """
@@ -57,5 +120,10 @@ def check(
         affected_endpoints=affected_endpoints,
         additional_keys=additional_keys,
         error_status_extracting=error_status_extracting,
+        reuse_connections=reuse_connections,
+        circuit_breaker=circuit_breaker,
+        measure_latency=measure_latency,
+        latency_threshold=latency_threshold,
+        max_body_size=max_body_size,
         **requests_args,
     )
@@ -1,13 +1,25 @@
-from typing import Callable
+from typing import Callable, Union
 
 from starlette.applications import Starlette
-from starlette.responses import JSONResponse
+from starlette.responses import Response
 
 import healthpy
-from healthpy._response import response_body, consul_response_status_code
+from healthpy._response import (
+    _ResponseBody,
+    _details_requested,
+    _etag_matches,
+    consul_response_status_code,
+)
 
 
-def add_consul_health_endpoint(app: Starlette, health_check: Callable, **kwargs):
+def add_consul_health_endpoint(
+    app: Starlette,
+    health_check: Callable,
+    cache_ttl: float = None,
+    single_flight: bool = False,
+    serializer: Callable[[dict], Union[bytes, str]] = None,
+    **kwargs,
+):
     """
     Create /health: Consul Health check endpoint implementing https://inadarei.github.io/rfc-healthcheck/ but following
     Consul expected status code (https://www.consul.io/docs/agent/checks.html).
@@ -15,6 +27,12 @@ def add_consul_health_endpoint(app: Starlette, health_check: Callable, **kwargs)
     :param app: The ASGI application.
     :param health_check: async callable returning a tuple of size 2 with a string providing the status (pass, warn, fail)
     and the "Checks object" as a dictionary as per https://inadarei.github.io/rfc-healthcheck/
+    :param cache_ttl: (optional) number of seconds the result of health_check will be reused for.
+    Refer to healthpy.cached for more details. Default to None (health_check is called for every request).
+    :param single_flight: (optional) concurrent requests received while health_check is being performed will share its
+    result instead of calling it again. Refer to healthpy.single_flight for more details. Default to False.
+    :param serializer: (optional) callable encoding the response body (as a dict) into JSON bytes (or str).
+    Default to orjson (if installed) or the json module.
     :param version: (optional) public version of the service. If not provided, version will be extracted from the
     release_id, considering that release_id is following semantic versioning.
     Version will be considered as the MAJOR component of a MAJOR.MINOR.PATCH release_id.
@@ -33,6 +51,11 @@ def add_consul_health_endpoint(app: Starlette, health_check: Callable, **kwargs)
     :param service_id: (optional) is a unique identifier of the service, in the application scope.
     :param description: (optional) is a human-friendly description of the service.
     """
+    if single_flight:
+        health_check = healthpy.single_flight(health_check)
+    if cache_ttl:
+        health_check = healthpy.cached(health_check, cache_ttl)
+    response_body = _ResponseBody(serializer, **kwargs)
 
     @app.route("/health")
     async def health(request):
@@ -128,14 +151,31 @@ def add_consul_health_endpoint(app: Starlette, health_check: Callable, **kwargs)
         tags:
             - Monitoring
         """
+        failure = None
         try:
             status, checks = await health_check()
-            body = response_body(status, checks=checks, **kwargs)
         except Exception as e:
-            status = healthpy.fail_status
-            body = response_body(status, output=str(e), **kwargs)
-        return JSONResponse(
-            body,
-            status_code=consul_response_status_code(status),
+            status, failure = healthpy.fail_status, str(e)
+        status_code = consul_response_status_code(status)
+        # Probes only looking at the status code do not need the body to be built
+        if request.method == "HEAD":
+            return Response(status_code=status_code)
+        if not _details_requested(request.query_params.get("details")):
+            return Response(
+                response_body.status(status),
+                status_code=status_code,
+                media_type="application/health+json",
+            )
+
+        if failure is None:
+            encoded = response_body.checks(status, checks)
+        else:
+            encoded = response_body.output(status, failure)
+        if _etag_matches(request.headers.get("if-none-match"), encoded.etag):
+            return Response(status_code=304, headers={"ETag": encoded.etag})
+        return Response(
+            encoded.body,
+            status_code=status_code,
+            headers={"ETag": encoded.etag},
             media_type="application/health+json",
         )
@@ -40,11 +40,15 @@ setup(
             # Used to mock httpx HTTP responses
             "pytest-httpx==0.10.*",
             # Used to check redis health
-            "redis==3.*",
+            "redis==4.*",
             # Used to check starlette endpoint
             "starlette==0.13.*",
             # Used to check flask-restx endpoint
             "flask-restx==0.2.*",
+            # Used to serialize health check responses
+            "orjson==3.*",
+            # Used to run async checks
+            "pytest-asyncio==0.14.*",
             # Used to check coverage
             "pytest-cov==2.*",
         ]
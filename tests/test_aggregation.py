@@ -0,0 +1,104 @@
+import healthpy
+
+
+def result(name: str, status: str) -> (str, dict):
+    return status, {f"{name}:health": {"status": status}}
+
+
+def test_without_results():
+    assert healthpy.aggregate({}) == ("pass", {})
+
+
+def test_without_policies_is_same_as_status():
+    for statuses in [
+        ("pass", "pass"),
+        ("pass", "warn"),
+        ("warn", "fail"),
+        ("fail", "pass"),
+    ]:
+        status, checks = healthpy.aggregate(
+            {
+                f"check{i}": result(f"check{i}", status)
+                for i, status in enumerate(statuses)
+            }
+        )
+        assert status == healthpy.status(*statuses)
+        assert checks == {
+            f"check{i}:health": {"status": status} for i, status in enumerate(statuses)
+        }
+
+
+def test_non_critical_failure_is_warn():
+    assert (
+        healthpy.aggregate(
+            {"db": result("db", "pass"), "cache": result("cache", "fail")},
+            policies={"cache": healthpy.CheckPolicy(critical=False)},
+        )[0]
+        == "warn"
+    )
+    assert (
+        healthpy.aggregate(
+            {"db": result("db", "fail"), "cache": result("cache", "fail")},
+            policies={"cache": healthpy.CheckPolicy(critical=False)},
+        )[0]
+        == "fail"
+    )
+
+
+def test_group_threshold():
+    policies = {f"replica{i}": healthpy.CheckPolicy(group="replicas") for i in range(3)}
+
+    def aggregated(*statuses: str) -> str:
+        return healthpy.aggregate(
+            {
+                f"replica{i}": result(f"replica{i}", status)
+                for i, status in enumerate(statuses)
+            },
+            policies=policies,
+            groups={"replicas": 2},
+        )[0]
+
+    assert aggregated("pass", "pass", "pass") == "pass"
+    assert aggregated("pass", "warn", "pass") == "warn"
+    assert aggregated("fail", "pass", "pass") == "warn"
+    assert aggregated("fail", "pass", "fail") == "fail"
+
+
+def test_group_weights():
+    policies = {
+        "primary": healthpy.CheckPolicy(group="db", weight=2),
+        "secondary": healthpy.CheckPolicy(group="db"),
+    }
+    results = {
+        "primary": result("primary", "fail"),
+        "secondary": result("secondary", "pass"),
+    }
+    assert healthpy.aggregate(results, policies, groups={"db": 2})[0] == "fail"
+    assert healthpy.aggregate(results, policies, groups={"db": 3})[0] == "warn"
+
+
+def test_group_fails_when_all_checks_fail_by_default():
+    policies = {
+        "replica1": healthpy.CheckPolicy(group="replicas"),
+        "replica2": healthpy.CheckPolicy(group="replicas"),
+    }
+    assert (
+        healthpy.aggregate(
+            {
+                "replica1": result("replica1", "fail"),
+                "replica2": result("replica2", "pass"),
+            },
+            policies,
+        )[0]
+        == "warn"
+    )
+    assert (
+        healthpy.aggregate(
+            {
+                "replica1": result("replica1", "fail"),
+                "replica2": result("replica2", "fail"),
+            },
+            policies,
+        )[0]
+        == "fail"
+    )
@@ -0,0 +1,199 @@
+import asyncio
+import time
+import traceback
+
+import pytest
+
+import healthpy
+
+
+class Check:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def async_call(self):
+        return self()
+
+
+def test_first_call_is_not_cached():
+    check = Check(("pass", {"tests:health": {"status": "pass"}}))
+    cached = healthpy.cached(check, ttl=10)
+    assert cached() == ("pass", {"tests:health": {"status": "pass"}})
+    assert check.calls == 1
+
+
+def test_fresh_result_is_reused():
+    check = Check(("pass", {"tests:health": {"status": "pass"}}))
+    cached = healthpy.cached(check, ttl=10)
+    cached()
+    status, checks = cached()
+    assert status == "pass"
+    assert checks == {
+        "tests:health": {
+            "status": "pass",
+            "cacheAge": checks["tests:health"]["cacheAge"],
+        }
+    }
+    assert 0 <= checks["tests:health"]["cacheAge"] < 10
+    assert check.calls == 1
+
+
+def test_cached_exception_traceback_does_not_grow():
+    check = Check(Exception("failure explanation"))
+    cached = healthpy.cached(check, ttl=10)
+    depths = []
+    for _ in range(3):
+        with pytest.raises(Exception, match="failure explanation") as exception_info:
+            cached()
+        depths.append(len(traceback.extract_tb(exception_info.value.__traceback__)))
+    assert depths[0] == depths[1] == depths[2]
+
+
+def test_list_of_checks_is_aged():
+    check = Check(("pass", {"tests:health": [{"status": "pass"}, {"status": "pass"}]}))
+    cached = healthpy.cached(check, ttl=10)
+    cached()
+    status, checks = cached()
+    assert [instance.keys() for instance in checks["tests:health"]] == [
+        {"status", "cacheAge"},
+        {"status", "cacheAge"},
+    ]
+
+
+def test_stale_result_is_returned_while_refreshing():
+    check = Check(
+        ("pass", {"tests:health": {"status": "pass"}}),
+        ("fail", {"tests:health": {"status": "fail"}}),
+    )
+    cached = healthpy.cached(check, ttl=0.1)
+    cached()
+    time.sleep(0.15)
+    status, checks = cached()
+    assert status == "pass"
+    assert checks["tests:health"]["cacheAge"] >= 0.1
+    # Give some time to the background refresh
+    time.sleep(0.05)
+    status, checks = cached()
+    assert status == "fail"
+    assert checks["tests:health"]["cacheAge"] < 0.1
+    assert check.calls == 2
+
+
+def test_exception_is_cached():
+    check = Check(Exception("failure explanation"))
+    cached = healthpy.cached(check, ttl=10)
+    for _ in range(2):
+        with pytest.raises(Exception, match="failure explanation"):
+            cached()
+    assert check.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_async_fresh_result_is_reused():
+    check = Check(("pass", {"tests:health": {"status": "pass"}}))
+    cached = healthpy.cached(check.async_call, ttl=10)
+    assert await cached() == ("pass", {"tests:health": {"status": "pass"}})
+    status, checks = await cached()
+    assert status == "pass"
+    assert 0 <= checks["tests:health"]["cacheAge"] < 10
+    assert check.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_async_stale_result_is_returned_while_refreshing():
+    check = Check(
+        ("pass", {"tests:health": {"status": "pass"}}),
+        ("fail", {"tests:health": {"status": "fail"}}),
+    )
+    cached = healthpy.cached(check.async_call, ttl=0.1)
+    await cached()
+    await asyncio.sleep(0.15)
+    status, checks = await cached()
+    assert status == "pass"
+    assert checks["tests:health"]["cacheAge"] >= 0.1
+    # Give some time to the background refresh
+    await asyncio.sleep(0.05)
+    status, checks = await cached()
+    assert status == "fail"
+    assert check.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_async_cancelled_refresh_is_performed_again():
+    check = Check(
+        ("pass", {"tests:health": {"status": "pass"}}),
+        ("fail", {"tests:health": {"status": "fail"}}),
+    )
+    blocked = asyncio.Event()
+
+    async def blocking_check():
+        if check.calls:
+            await blocked.wait()
+        return check()
+
+    cached = healthpy.cached(blocking_check, ttl=0.1)
+    await cached()
+    await asyncio.sleep(0.15)
+    await cached()
+    cached._refresh_task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await cached._refresh_task
+
+    blocked.set()
+    status, _ = await cached()
+    assert status == "pass"
+    # Give some time to the background refresh
+    await asyncio.sleep(0.05)
+    status, _ = await cached()
+    assert status == "fail"
+    assert check.calls == 2
+
+
+def run_in_new_event_loop(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        # As asyncio.run, cancel tasks that are still pending before closing the event loop
+        pending = asyncio.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(asyncio.wait(pending))
+        loop.close()
+
+
+def test_async_stale_result_is_refreshed_with_an_event_loop_per_call():
+    check = Check(
+        ("pass", {"tests:health": {"status": "pass"}}),
+        ("fail", {"tests:health": {"status": "fail"}}),
+        ("warn", {"tests:health": {"status": "warn"}}),
+    )
+    cached = healthpy.cached(check.async_call, ttl=0.1)
+    assert run_in_new_event_loop(cached())[0] == "pass"
+    status, checks = run_in_new_event_loop(cached())
+    assert status == "pass"
+    assert "cacheAge" in checks["tests:health"]
+    time.sleep(0.15)
+    status, checks = run_in_new_event_loop(cached())
+    assert status == "fail"
+    assert "cacheAge" not in checks["tests:health"]
+    assert check.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_async_exception_is_cached():
+    check = Check(Exception("failure explanation"))
+    cached = healthpy.cached(check.async_call, ttl=10)
+    for _ in range(2):
+        with pytest.raises(Exception, match="failure explanation"):
+            await cached()
+    assert check.calls == 1
@@ -0,0 +1,103 @@
+import pytest
+
+import healthpy
+import healthpy._circuit_breaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(healthpy._circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def perform(breaker: healthpy.CircuitBreaker, status: str) -> (str, dict):
+    rejected = breaker._acquire("test")
+    if rejected:
+        return rejected
+    return breaker._release(
+        "test", (status, {"test:health": {"status": status, "try": status}})
+    )
+
+
+def test_circuit_opens_after_consecutive_failures(clock):
+    breaker = healthpy.CircuitBreaker(failure_threshold=2, open_duration=10)
+    assert perform(breaker, "fail") == (
+        "fail",
+        {"test:health": {"status": "fail", "try": "fail", "circuitBreaker": "closed"}},
+    )
+    assert breaker.state("test") == "closed"
+    assert perform(breaker, "fail") == (
+        "fail",
+        {"test:health": {"status": "fail", "try": "fail", "circuitBreaker": "open"}},
+    )
+    assert breaker.state("test") == "open"
+    # Latest failing result is returned without performing the check
+    assert perform(breaker, "pass") == (
+        "fail",
+        {"test:health": {"status": "fail", "try": "fail", "circuitBreaker": "open"}},
+    )
+
+
+def test_success_resets_failures(clock):
+    breaker = healthpy.CircuitBreaker(failure_threshold=2)
+    perform(breaker, "fail")
+    perform(breaker, "warn")
+    perform(breaker, "fail")
+    assert breaker.state("test") == "closed"
+
+
+def test_failing_trial_opens_circuit_again(clock):
+    breaker = healthpy.CircuitBreaker(failure_threshold=1, open_duration=10)
+    perform(breaker, "fail")
+    clock[0] = 10
+    assert perform(breaker, "fail")[1]["test:health"]["circuitBreaker"] == "open"
+    clock[0] = 15
+    assert perform(breaker, "pass")[0] == "fail"
+
+
+def test_successful_trials_close_circuit(clock):
+    breaker = healthpy.CircuitBreaker(
+        failure_threshold=1, open_duration=10, trial_probes=2
+    )
+    perform(breaker, "fail")
+    clock[0] = 10
+    assert perform(breaker, "pass") == (
+        "pass",
+        {
+            "test:health": {
+                "status": "pass",
+                "try": "pass",
+                "circuitBreaker": "half-open",
+            }
+        },
+    )
+    assert perform(breaker, "pass")[1]["test:health"]["circuitBreaker"] == "closed"
+    assert breaker.state("test") == "closed"
+
+
+def test_single_trial_in_flight(clock):
+    breaker = healthpy.CircuitBreaker(failure_threshold=1, open_duration=10)
+    perform(breaker, "fail")
+    clock[0] = 10
+    assert breaker._acquire("test") is None
+    assert breaker._acquire("test") == (
+        "fail",
+        {
+            "test:health": {
+                "status": "fail",
+                "try": "fail",
+                "circuitBreaker": "half-open",
+            }
+        },
+    )
+    breaker._abort("test")
+    assert breaker._acquire("test") is None
+
+
+def test_circuits_per_service(clock):
+    breaker = healthpy.CircuitBreaker(failure_threshold=1)
+    perform(breaker, "fail")
+    assert breaker.state("test") == "open"
+    assert breaker.state("other") == "closed"
+    assert breaker._acquire("other") is None
@@ -1,8 +1,14 @@
+import asyncio
+import gc
 import json
+import warnings
 
 from pytest_httpx import httpx_mock, HTTPXMock
 import httpx
+import pytest
 
+import healthpy._clients
+import healthpy._latency
 import healthpy.httpx
 from healthpy.testing import mock_http_health_datetime
 
@@ -722,3 +728,575 @@ def test_show_affected_endpoints_when_request_failed_404(
             }
         },
     )
+
+
+@pytest.mark.asyncio
+async def test_async_exception_health_check(
+    mock_http_health_datetime, httpx_mock: HTTPXMock
+):
+    assert await healthpy.httpx.async_check("tests", "http://test/health") == (
+        "fail",
+        {
+            "tests:health": {
+                "componentType": "http://test/health",
+                "output": "No response can be found for GET request on http://test/health",
+                "status": "fail",
+                "time": "2018-10-11T15:05:05.663979",
+            }
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_error_health_check(
+    mock_http_health_datetime, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(
+        url="http://test/health",
+        method="GET",
+        status_code=500,
+        data="Error message",
+    )
+    assert await healthpy.httpx.async_check("tests", "http://test/health") == (
+        "fail",
+        {
+            "tests:health": {
+                "componentType": "http://test/health",
+                "output": "Error message",
+                "status": "fail",
+                "time": "2018-10-11T15:05:05.663979",
+            }
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_pass_status_health_check(
+    mock_http_health_datetime, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(
+        url="http://test/health",
+        method="GET",
+        status_code=200,
+        json={"status": "pass", "version": "1", "releaseId": "1.2.3"},
+        headers={"content-type": "application/json"},
+    )
+    assert await healthpy.httpx.async_check(
+        "tests", "http://test/health", additional_keys={"custom": "test"}
+    ) == (
+        "pass",
+        {
+            "tests:health": {
+                "componentType": "http://test/health",
+                "observedValue": {
+                    "status": "pass",
+                    "version": "1",
+                    "releaseId": "1.2.3",
+                },
+                "status": "pass",
+                "time": "2018-10-11T15:05:05.663979",
+                "custom": "test",
+            }
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_warn_status_health_check(
+    mock_http_health_datetime, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(
+        url="http://test/health",
+        method="GET",
+        status_code=200,
+        json={"status": "warn"},
+        headers={"content-type": "application/health+json"},
+    )
+    assert await healthpy.httpx.async_check(
+        "tests", "http://test/health", affected_endpoints=["/testroute"]
+    ) == (
+        "warn",
+        {
+            "tests:health": {
+                "componentType": "http://test/health",
+                "observedValue": {"status": "warn"},
+                "status": "warn",
+                "affectedEndpoints": ["/testroute"],
+                "time": "2018-10-11T15:05:05.663979",
+            }
+        },
+    )
+
+
+def test_reuse_connections(
+    monkeypatch, mock_http_health_datetime, httpx_mock: HTTPXMock
+):
+    clients = []
+    monkeypatch.setattr(
+        healthpy.httpx._clients,
+        "_create",
+        lambda **args: clients.append(httpx.Client(**args)) or clients[-1],
+    )
+    httpx_mock.add_response(url="http://test/health", json={"status": "pass"})
+    httpx_mock.add_response(url="http://test/status", json={"status": "pass"})
+    httpx_mock.add_response(url="http://test/health", json={"status": "pass"})
+
+    for url in ["http://test/health", "http://test/status"]:
+        status, _ = healthpy.httpx.check("tests", url, reuse_connections=True)
+        assert status == "pass"
+    assert len(clients) == 1
+
+    healthpy.httpx.check(
+        "tests", "http://test/health", reuse_connections=True, timeout=2
+    )
+    assert len(clients) == 2
+
+    healthpy.httpx.close()
+    assert all(client.is_closed for client in clients)
+    assert healthpy.httpx._clients.pop() == []
+
+
+@pytest.mark.asyncio
+async def test_async_reuse_connections(
+    monkeypatch, mock_http_health_datetime, httpx_mock: HTTPXMock
+):
+    clients = []
+    monkeypatch.setattr(
+        healthpy.httpx._async_clients,
+        "_create",
+        lambda **args: clients.append(httpx.AsyncClient(**args)) or clients[-1],
+    )
+    httpx_mock.add_response(url="http://test/health", json={"status": "pass"})
+    httpx_mock.add_response(url="http://test/status", json={"status": "pass"})
+
+    for url in ["http://test/health", "http://test/status"]:
+        status, _ = await healthpy.httpx.async_check(
+            "tests", url, reuse_connections=True
+        )
+        assert status == "pass"
+    assert len(clients) == 1
+
+    await healthpy.httpx.aclose()
+    assert clients[0].is_closed
+    assert asyncio.get_running_loop() not in healthpy.httpx._async_clients._scoped
+
+
+def run_in_new_event_loop(coroutine):
+    # As asyncio.run, without changing the current event loop
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+def test_async_reuse_connections_with_an_event_loop_per_check(
+    mock_http_health_datetime, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(url="http://test/health", json={"status": "pass"})
+    with warnings.catch_warnings(record=True) as records:
+        warnings.simplefilter("always")
+        for _ in range(2):
+            status, _ = run_in_new_event_loop(
+                healthpy.httpx.async_check(
+                    "tests", "http://test/health", reuse_connections=True
+                )
+            )
+            assert status == "pass"
+        gc.collect()
+    # Clients are closed when their event loop shuts down
+    assert [
+        str(record.message)
+        for record in records
+        if str(record.message).startswith("Unclosed")
+    ] == []
+    # Clients do not keep their event loop alive
+    assert len(healthpy.httpx._async_clients._scoped) == 0
+
+
+def test_async_clients_of_closed_event_loop_are_discarded():
+    closed = []
+
+    async def aclose(client):
+        closed.append(client)
+
+    clients = healthpy._clients._Clients(lambda **options: object(), aclose)
+    closed_loop, loop = asyncio.new_event_loop(), asyncio.new_event_loop()
+    client = closed_loop.run_until_complete(clients.aget("http://test/health", {}))
+    assert (
+        closed_loop.run_until_complete(clients.aget("http://test/status", {})) is client
+    )
+    # Without shutting down asynchronous generators
+    closed_loop.close()
+    other_client = loop.run_until_complete(clients.aget("http://test/health", {}))
+    assert other_client is not client
+    assert list(clients._scoped) == [loop]
+    loop.run_until_complete(loop.shutdown_asyncgens())
+    loop.close()
+    assert closed == [other_client]
+
+
+def test_circuit_breaker(mock_http_health_datetime, httpx_mock: HTTPXMock):
+    breaker = healthpy.CircuitBreaker(failure_threshold=2, open_duration=60)
+    httpx_mock.add_response(url="http://test/health", status_code=500, data="down")
+    httpx_mock.add_response(url="http://test/health", status_code=500, data="down")
+    assert (
+        healthpy.httpx.check("tests", "http://test/health", circuit_breaker=breaker)[1][
+            "tests:health"
+        ]["circuitBreaker"]
+        == "closed"
+    )
+    failing = healthpy.httpx.check(
+        "tests", "http://test/health", circuit_breaker=breaker
+    )
+    assert failing == (
+        "fail",
+        {
+            "tests:health": {
+                "componentType": "http://test/health",
+                "output": "down",
+                "status": "fail",
+                "time": "2018-10-11T15:05:05.663979",
+                "circuitBreaker": "open",
+            }
+        },
+    )
+    # No request is sent while the circuit is open
+    assert (
+        healthpy.httpx.check("tests", "http://test/health", circuit_breaker=breaker)
+        == failing
+    )
+    assert len(httpx_mock.get_requests()) == 2
+
+
+@pytest.mark.asyncio
+async def test_async_circuit_breaker(mock_http_health_datetime, httpx_mock: HTTPXMock):
+    breaker = healthpy.CircuitBreaker(failure_threshold=1, open_duration=60)
+    httpx_mock.add_response(url="http://test/health", status_code=500, data="down")
+    failing = await healthpy.httpx.async_check(
+        "tests", "http://test/health", circuit_breaker=breaker
+    )
+    assert failing[1]["tests:health"]["circuitBreaker"] == "open"
+    assert (
+        await healthpy.httpx.async_check(
+            "tests", "http://test/health", circuit_breaker=breaker
+        )
+        == failing
+    )
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_check_replicas_first_healthy_wins(
+    mock_http_health_datetime, monkeypatch
+):
+    async def send(url: str, **args):
+        if url == "http://slow/health":
+            await asyncio.sleep(10)
+        if url == "http://down/health":
+            raise ConnectionRefusedError("Connection refused")
+        return healthpy.httpx._AsyncRequest(
+            httpx.Response(
+                200,
+                request=httpx.Request("GET", url),
+                json={"status": "warn"},
+                headers={"content-type": "application/health+json"},
+            )
+        )
+
+    monkeypatch.setattr(healthpy.httpx._AsyncRequest, "send", send)
+    status, checks = await healthpy.httpx.async_check_replicas(
+        "tests", ["http://slow/health", "http://down/health", "http://test/health"]
+    )
+    assert status == "warn"
+    replicas = checks["tests:health"].pop("observedValue")
+    assert checks == {
+        "tests:health": {
+            "componentType": "component",
+            "status": "warn",
+            "time": "2018-10-11T15:05:05.663979",
+        }
+    }
+    assert replicas["http://slow/health"] == {"cancelled": True}
+    assert replicas["http://down/health"].pop("latency") >= 0
+    assert replicas["http://down/health"] == {
+        "status": "fail",
+        "output": "Connection refused",
+    }
+    assert replicas["http://test/health"].pop("latency") >= 0
+    assert replicas["http://test/health"] == {"status": "warn"}
+
+
+@pytest.mark.asyncio
+async def test_async_check_replicas_quorum(
+    mock_http_health_datetime, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(url="http://test1/health", json={"status": "pass"})
+    httpx_mock.add_response(url="http://test2/health", json={"status": "pass"})
+    httpx_mock.add_response(url="http://test3/health", status_code=500, data="down")
+    status, checks = await healthpy.httpx.async_check_replicas(
+        "tests",
+        ["http://test1/health", "http://test2/health", "http://test3/health"],
+        quorum=2,
+    )
+    assert status == "pass"
+    assert "output" not in checks["tests:health"]
+
+
+@pytest.mark.asyncio
+async def test_async_check_replicas_quorum_not_reached(
+    mock_http_health_datetime, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(url="http://test1/health", json={"status": "pass"})
+    httpx_mock.add_response(url="http://test2/health", status_code=500, data="down")
+    httpx_mock.add_response(url="http://test3/health", status_code=500, data="down")
+    status, checks = await healthpy.httpx.async_check_replicas(
+        "tests",
+        ["http://test1/health", "http://test2/health", "http://test3/health"],
+        quorum=2,
+        affected_endpoints=["/test"],
+    )
+    assert status == "fail"
+    assert checks["tests:health"]["output"] == (
+        "1 healthy replica(s) out of 2 required."
+    )
+    assert checks["tests:health"]["affectedEndpoints"] == ["/test"]
+    assert (
+        checks["tests:health"]["observedValue"]["http://test2/health"]["output"]
+        == "down"
+    )
+
+
+def test_latency(mock_http_health_datetime, httpx_mock: HTTPXMock, monkeypatch):
+    monkeypatch.setattr(healthpy._latency, "_elapsed", lambda start: 150.2)
+    httpx_mock.add_response(url="http://test/health", json={"status": "pass"})
+    assert healthpy.httpx.check(
+        "tests", "http://test/health", measure_latency=True
+    ) == (
+        "pass",
+        {
+            "tests:health": {
+                "componentType": "http://test/health",
+                "observedValue": {"status": "pass"},
+                "status": "pass",
+                "time": "2018-10-11T15:05:05.663979",
+                "latency": 150.2,
+            }
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_latency_above_threshold(
+    mock_http_health_datetime, httpx_mock: HTTPXMock, monkeypatch
+):
+    monkeypatch.setattr(healthpy._latency, "_elapsed", lambda start: 150.2)
+    httpx_mock.add_response(url="http://test/health", json={"status": "pass"})
+    assert await healthpy.httpx.async_check(
+        "tests", "http://test/health", latency_threshold=100
+    ) == (
+        "warn",
+        {
+            "tests:health": {
+                "componentType": "http://test/health",
+                "observedValue": {"status": "pass"},
+                "output": "Response took more than 100 ms.",
+                "status": "warn",
+                "time": "2018-10-11T15:05:05.663979",
+                "latency": 150.2,
+            }
+        },
+    )
+
+
+def test_max_body_size_truncated(mock_http_health_datetime, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        url="http://test/health",
+        status_code=500,
+        data="<html>" + "a" * 10000 + "</html>",
+        headers={"content-type": "text/html"},
+    )
+    assert healthpy.httpx.check("tests", "http://test/health", max_body_size=10) == (
+        "fail",
+        {
+            "tests:health": {
+                "componentType": "http://test/health",
+                "output": "<html>aaaa",
+                "status": "fail",
+                "time": "2018-10-11T15:05:05.663979",
+                "truncated": True,
+            }
+        },
+    )
+
+
+def test_max_body_size_not_reached(mock_http_health_datetime, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        url="http://test/health",
+        json={"status": "warn"},
+        headers={"content-type": "application/health+json"},
+    )
+    assert healthpy.httpx.check("tests", "http://test/health", max_body_size=100) == (
+        "warn",
+        {
+            "tests:health": {
+                "componentType": "http://test/health",
+                "observedValue": {"status": "warn"},
+                "status": "warn",
+                "time": "2018-10-11T15:05:05.663979",
+            }
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_max_body_size_truncated_json(
+    mock_http_health_datetime, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(
+        url="http://test/health",
+        json={"status": "pass", "details": "a" * 10000},
+        headers={"content-type": "application/health+json"},
+    )
+    assert await healthpy.httpx.async_check(
+        "tests",
+        "http://test/health",
+        max_body_size=20,
+        status_extracting=lambda body: "pass" if '"pass"' in body else "fail",
+    ) == (
+        "pass",
+        {
+            "tests:health": {
+                "componentType": "http://test/health",
+                "observedValue": '{"status": "pass", "',
+                "status": "pass",
+                "time": "2018-10-11T15:05:05.663979",
+                "truncated": True,
+            }
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_max_body_size_truncated_json_default_status(
+    mock_http_health_datetime, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(
+        url="http://test/health",
+        json={"status": "warn", "details": "a" * 10000},
+        headers={"content-type": "application/health+json"},
+    )
+    assert await healthpy.httpx.async_check(
+        "tests", "http://test/health", max_body_size=30
+    ) == (
+        "warn",
+        {
+            "tests:health": {
+                "componentType": "http://test/health",
+                "observedValue": '{"status": "warn", "details": ',
+                "status": "warn",
+                "time": "2018-10-11T15:05:05.663979",
+                "truncated": True,
+            }
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_check_fleet(mock_http_health_datetime, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        url="http://service1/health",
+        json={"status": "pass"},
+        headers={"content-type": "application/health+json"},
+    )
+    httpx_mock.add_response(
+        url="http://service2/health",
+        json={"status": "warn"},
+        headers={"content-type": "application/health+json"},
+    )
+    httpx_mock.add_response(url="http://service3/health", status_code=500, data="down")
+    assert await healthpy.httpx.async_check_fleet(
+        {
+            "service1": "http://service1/health",
+            "service2": "http://service2/health",
+            "service3": "http://service3/health",
+        }
+    ) == (
+        "fail",
+        {
+            "service1:health": {
+                "componentType": "http://service1/health",
+                "observedValue": {"status": "pass"},
+                "status": "pass",
+                "time": "2018-10-11T15:05:05.663979",
+            },
+            "service2:health": {
+                "componentType": "http://service2/health",
+                "observedValue": {"status": "warn"},
+                "status": "warn",
+                "time": "2018-10-11T15:05:05.663979",
+            },
+            "service3:health": {
+                "componentType": "http://service3/health",
+                "output": "down",
+                "status": "fail",
+                "time": "2018-10-11T15:05:05.663979",
+            },
+            "fleet:status": {
+                "componentType": "system",
+                "observedValue": {"pass": 1, "warn": 1, "fail": 1},
+                "status": "fail",
+                "time": "2018-10-11T15:05:05.663979",
+            },
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_check_fleet_policies(
+    mock_http_health_datetime, httpx_mock: HTTPXMock
+):
+    httpx_mock.add_response(url="http://service1/health", json={"status": "pass"})
+    httpx_mock.add_response(url="http://service2/health", status_code=500)
+    status, checks = await healthpy.httpx.async_check_fleet(
+        {"service1": "http://service1/health", "service2": "http://service2/health"},
+        policies={"service2": healthpy.CheckPolicy(critical=False)},
+    )
+    assert status == "warn"
+    assert checks["fleet:status"]["observedValue"] == {
+        "pass": 1,
+        "warn": 0,
+        "fail": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_async_check_fleet_bounded_concurrency(
+    mock_http_health_datetime, monkeypatch
+):
+    in_flight = []
+    clients = set()
+
+    async def send(url: str, client: httpx.AsyncClient, **args):
+        clients.add(client)
+        in_flight.append(url)
+        assert len(in_flight) <= 3
+        await asyncio.sleep(0.01)
+        in_flight.remove(url)
+        return healthpy.httpx._AsyncRequest(
+            httpx.Response(200, request=httpx.Request("GET", url), text="OK")
+        )
+
+    monkeypatch.setattr(healthpy.httpx._AsyncRequest, "send", send)
+    status, checks = await healthpy.httpx.async_check_fleet(
+        {f"service{i}": f"http://service{i}/health" for i in range(20)},
+        max_concurrency=3,
+    )
+    assert status == "pass"
+    assert len(clients) == 1
+    assert checks["fleet:status"]["observedValue"] == {
+        "pass": 20,
+        "warn": 0,
+        "fail": 0,
+    }
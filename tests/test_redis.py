@@ -1,5 +1,14 @@
+import asyncio
+import concurrent.futures
+import fnmatch
+import gc
+import time
+
+import pytest
 import redis
+import redis.asyncio
 
+import healthpy._latency
 import healthpy.redis
 
 
@@ -178,3 +187,628 @@ def test_redis_health_details_missing_key(monkeypatch):
             "output": "local_my_host cannot be found in []",
         }
     }
+
+
+def test_redis_health_details_scan_ok(monkeypatch):
+    scans = []
+
+    def scan(self, cursor, match, count):
+        scans.append((cursor, match, count))
+        return {0: (12, []), 12: (27, [b"local"])}[cursor]
+
+    monkeypatch.setattr(redis.Redis, "ping", lambda *args: 1)
+    monkeypatch.setattr(redis.Redis, "scan", scan)
+    monkeypatch.setattr(healthpy.redis, "datetime", DateTimeMock)
+
+    status, details = healthpy.redis.check(
+        "redis://test_url", "local_*", scan_count=100
+    )
+    assert status == "pass"
+    assert details == {
+        "redis:ping": {
+            "componentType": "component",
+            "observedValue": "local_* can be found.",
+            "scanCalls": 2,
+            "status": "pass",
+            "time": "2018-10-11T15:05:05.663979",
+        }
+    }
+    assert scans == [(0, "local_*", 100), (12, "local_*", 100)]
+
+
+def test_redis_health_details_scan_missing_key(monkeypatch):
+    def scan(self, cursor, match, count):
+        return {0: (12, []), 12: (0, [])}[cursor]
+
+    monkeypatch.setattr(redis.Redis, "ping", lambda *args: 1)
+    monkeypatch.setattr(redis.Redis, "scan", scan)
+    monkeypatch.setattr(healthpy.redis, "datetime", DateTimeMock)
+
+    status, details = healthpy.redis.check(
+        "redis://test_url", "local_*", additional_keys={"custom": "test"}, scan_count=10
+    )
+    assert status == "fail"
+    assert details == {
+        "redis:ping": {
+            "componentType": "component",
+            "output": "local_* cannot be found.",
+            "scanCalls": 2,
+            "status": "fail",
+            "time": "2018-10-11T15:05:05.663979",
+            "custom": "test",
+        }
+    }
+
+
+def test_redis_health_details_reuse_connections(monkeypatch):
+    clients = []
+
+    def ping(self):
+        clients.append(self)
+        return 1
+
+    monkeypatch.setattr(redis.Redis, "ping", ping)
+    monkeypatch.setattr(redis.Redis, "keys", lambda *args: ["local"])
+
+    for _ in range(2):
+        status, _ = healthpy.redis.check(
+            "redis://test_url",
+            "local_my_host",
+            reuse_connections=True,
+            max_connections=2,
+            socket_timeout=1.5,
+        )
+        assert status == "pass"
+    assert clients[0] is clients[1]
+    connection_kwargs = clients[0].connection_pool.connection_kwargs
+    assert connection_kwargs["socket_timeout"] == 1.5
+    assert connection_kwargs["socket_connect_timeout"] == 1.5
+    assert clients[0].connection_pool.max_connections == 2
+    assert clients[0].connection_pool.timeout == 1.5
+
+    healthpy.redis.close()
+    healthpy.redis.check("redis://test_url", "local_my_host", reuse_connections=True)
+    assert clients[2] is not clients[0]
+    healthpy.redis.close()
+
+
+def test_redis_health_details_concurrent_checks_wait_for_connections(monkeypatch):
+    in_use = []
+    max_in_use = []
+
+    def ping(self):
+        connection = self.connection_pool.get_connection("PING")
+        in_use.append(connection)
+        max_in_use.append(len(in_use))
+        time.sleep(0.05)
+        in_use.remove(connection)
+        self.connection_pool.release(connection)
+        return 1
+
+    monkeypatch.setattr(redis.Connection, "connect", lambda self: None)
+    monkeypatch.setattr(redis.Connection, "can_read", lambda self, timeout=0: False)
+    monkeypatch.setattr(redis.Redis, "ping", ping)
+    monkeypatch.setattr(redis.Redis, "keys", lambda *args: ["local"])
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [
+            executor.submit(
+                healthpy.redis.check,
+                "redis://test_url",
+                "local_my_host",
+                reuse_connections=True,
+                max_connections=2,
+                socket_timeout=5,
+            )
+            for _ in range(5)
+        ]
+        statuses = [future.result()[0] for future in futures]
+    assert statuses == ["pass"] * 5
+    assert max(max_in_use) <= 2
+    healthpy.redis.close()
+
+
+def test_redis_health_details_max_connections_without_socket_timeout(monkeypatch):
+    clients = []
+
+    def ping(self):
+        clients.append(self)
+        return 1
+
+    monkeypatch.setattr(redis.Redis, "ping", ping)
+    monkeypatch.setattr(redis.Redis, "keys", lambda *args: ["local"])
+
+    status, _ = healthpy.redis.check(
+        "redis://test_url", "local_my_host", max_connections=1
+    )
+    assert status == "pass"
+    assert clients[0].connection_pool.max_connections == 1
+    # Waiting for a connection is bounded even without socket_timeout
+    assert clients[0].connection_pool.timeout == 20
+
+
+@pytest.mark.asyncio
+async def test_async_redis_health_details_max_connections_without_socket_timeout(
+    monkeypatch,
+):
+    clients = []
+
+    async def ping(self):
+        clients.append(self)
+        return 1
+
+    monkeypatch.setattr(redis.asyncio.Redis, "ping", ping)
+    monkeypatch.setattr(redis.asyncio.Redis, "keys", async_return([b"local"]))
+
+    status, _ = await healthpy.redis.async_check(
+        "redis://test_url", "local_my_host", max_connections=1
+    )
+    assert status == "pass"
+    assert clients[0].connection_pool.timeout == 20
+
+
+def test_redis_health_details_without_reusing_connections(monkeypatch):
+    clients = []
+
+    def ping(self):
+        clients.append(self)
+        return 1
+
+    monkeypatch.setattr(redis.Redis, "ping", ping)
+    monkeypatch.setattr(redis.Redis, "keys", lambda *args: ["local"])
+
+    for _ in range(2):
+        healthpy.redis.check("redis://test_url", "local_my_host")
+    assert clients[0] is not clients[1]
+
+
+def test_redis_health_details_with_client(monkeypatch):
+    clients = []
+
+    def ping(self):
+        clients.append(self)
+        return 1
+
+    monkeypatch.setattr(redis.Redis, "ping", ping)
+    monkeypatch.setattr(redis.Redis, "keys", lambda *args: ["local"])
+    monkeypatch.setattr(healthpy.redis, "datetime", DateTimeMock)
+
+    client = redis.Redis.from_url("redis://test_url")
+    assert healthpy.redis.check(client, "local_my_host") == (
+        "pass",
+        {
+            "redis:ping": {
+                "componentType": "component",
+                "observedValue": "local_my_host can be found.",
+                "status": "pass",
+                "time": "2018-10-11T15:05:05.663979",
+            }
+        },
+    )
+    assert clients == [client]
+
+
+def test_redis_health_details_with_connection_pool(monkeypatch):
+    clients = []
+
+    def ping(self):
+        clients.append(self)
+        return 1
+
+    monkeypatch.setattr(redis.Redis, "ping", ping)
+    monkeypatch.setattr(redis.Redis, "keys", lambda *args: ["local"])
+
+    pool = redis.ConnectionPool.from_url("redis://test_url")
+    status, _ = healthpy.redis.check(pool, "local_my_host")
+    assert status == "pass"
+    assert clients[0].connection_pool is pool
+
+
+def async_return(value):
+    async def method(*args, **kwargs):
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    return method
+
+
+@pytest.mark.asyncio
+async def test_async_redis_health_details_ok(monkeypatch):
+    monkeypatch.setattr(redis.asyncio.Redis, "ping", async_return(1))
+    monkeypatch.setattr(redis.asyncio.Redis, "keys", async_return([b"local"]))
+    monkeypatch.setattr(healthpy.redis, "datetime", DateTimeMock)
+
+    assert await healthpy.redis.async_check(
+        "redis://test_url", "local_my_host", additional_keys={"custom": "test"}
+    ) == (
+        "pass",
+        {
+            "redis:ping": {
+                "componentType": "component",
+                "observedValue": "local_my_host can be found.",
+                "status": "pass",
+                "time": "2018-10-11T15:05:05.663979",
+                "custom": "test",
+            }
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_redis_health_details_missing_key(monkeypatch):
+    monkeypatch.setattr(redis.asyncio.Redis, "ping", async_return(1))
+    monkeypatch.setattr(redis.asyncio.Redis, "keys", async_return([]))
+    monkeypatch.setattr(healthpy.redis, "datetime", DateTimeMock)
+
+    assert await healthpy.redis.async_check("redis://test_url", "local_my_host") == (
+        "fail",
+        {
+            "redis:ping": {
+                "componentType": "component",
+                "output": "local_my_host cannot be found in []",
+                "status": "fail",
+                "time": "2018-10-11T15:05:05.663979",
+            }
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_redis_health_details_cannot_connect_to_redis(monkeypatch):
+    monkeypatch.setattr(
+        redis.asyncio.Redis,
+        "ping",
+        async_return(redis.exceptions.ConnectionError("Test message")),
+    )
+    monkeypatch.setattr(healthpy.redis, "datetime", DateTimeMock)
+
+    assert await healthpy.redis.async_check("redis://test_url", "") == (
+        "fail",
+        {
+            "redis:ping": {
+                "componentType": "component",
+                "output": "Test message",
+                "status": "fail",
+                "time": "2018-10-11T15:05:05.663979",
+            }
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_redis_health_details_scan(monkeypatch):
+    async def scan(self, cursor, match, count):
+        return {0: (12, []), 12: (0, [])}[cursor]
+
+    monkeypatch.setattr(redis.asyncio.Redis, "ping", async_return(1))
+    monkeypatch.setattr(redis.asyncio.Redis, "scan", scan)
+    monkeypatch.setattr(healthpy.redis, "datetime", DateTimeMock)
+
+    assert await healthpy.redis.async_check(
+        "redis://test_url", "local_*", scan_count=10
+    ) == (
+        "fail",
+        {
+            "redis:ping": {
+                "componentType": "component",
+                "output": "local_* cannot be found.",
+                "scanCalls": 2,
+                "status": "fail",
+                "time": "2018-10-11T15:05:05.663979",
+            }
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_redis_health_details_reuse_connections(monkeypatch):
+    clients = []
+
+    async def ping(self):
+        clients.append(self)
+        return 1
+
+    monkeypatch.setattr(redis.asyncio.Redis, "ping", ping)
+    monkeypatch.setattr(redis.asyncio.Redis, "keys", async_return([b"local"]))
+
+    for _ in range(2):
+        status, _ = await healthpy.redis.async_check(
+            "redis://test_url",
+            "local_my_host",
+            reuse_connections=True,
+            max_connections=2,
+            socket_timeout=1.5,
+        )
+        assert status == "pass"
+    assert clients[0] is clients[1]
+    assert clients[0].connection_pool.max_connections == 2
+    assert clients[0].connection_pool.connection_kwargs["socket_timeout"] == 1.5
+
+    await healthpy.redis.aclose()
+    assert asyncio.get_running_loop() not in healthpy.redis._async_clients._scoped
+
+
+@pytest.mark.asyncio
+async def test_async_redis_health_details_concurrent_checks_wait_for_connections(
+    monkeypatch,
+):
+    in_use = []
+    max_in_use = []
+
+    async def ping(self):
+        connection = await self.connection_pool.get_connection("PING")
+        in_use.append(connection)
+        max_in_use.append(len(in_use))
+        await asyncio.sleep(0.05)
+        in_use.remove(connection)
+        await self.connection_pool.release(connection)
+        return 1
+
+    monkeypatch.setattr(redis.asyncio.Connection, "connect", async_return(None))
+    monkeypatch.setattr(
+        redis.asyncio.Connection, "can_read_destructive", async_return(False)
+    )
+    monkeypatch.setattr(redis.asyncio.Redis, "ping", ping)
+    monkeypatch.setattr(redis.asyncio.Redis, "keys", async_return([b"local"]))
+
+    results = await asyncio.gather(
+        *[
+            healthpy.redis.async_check(
+                "redis://test_url",
+                "local_my_host",
+                reuse_connections=True,
+                max_connections=2,
+                socket_timeout=5,
+            )
+            for _ in range(5)
+        ]
+    )
+    assert [status for status, _ in results] == ["pass"] * 5
+    assert max(max_in_use) <= 2
+    await healthpy.redis.aclose()
+
+
+def run_in_new_event_loop(coroutine):
+    # As asyncio.run, without changing the current event loop
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+def test_async_redis_reuse_connections_with_an_event_loop_per_check(monkeypatch):
+    disconnected = []
+
+    async def disconnect(self, *args):
+        disconnected.append(self)
+
+    monkeypatch.setattr(redis.asyncio.Redis, "ping", async_return(1))
+    monkeypatch.setattr(redis.asyncio.Redis, "keys", async_return([b"local"]))
+    monkeypatch.setattr(redis.asyncio.ConnectionPool, "disconnect", disconnect)
+
+    for _ in range(2):
+        status, _ = run_in_new_event_loop(
+            healthpy.redis.async_check(
+                "redis://test_url", "local_my_host", reuse_connections=True
+            )
+        )
+        assert status == "pass"
+    # Clients are closed when their event loop shuts down
+    assert len(disconnected) == 2
+    # Clients do not keep their event loop alive
+    gc.collect()
+    assert len(healthpy.redis._async_clients._scoped) == 0
+
+
+@pytest.mark.asyncio
+async def test_async_redis_health_details_with_client_and_pool(monkeypatch):
+    clients = []
+
+    async def ping(self):
+        clients.append(self)
+        return 1
+
+    monkeypatch.setattr(redis.asyncio.Redis, "ping", ping)
+    monkeypatch.setattr(redis.asyncio.Redis, "keys", async_return([b"local"]))
+
+    client = redis.asyncio.Redis.from_url("redis://test_url")
+    status, _ = await healthpy.redis.async_check(client, "local_my_host")
+    assert status == "pass"
+    pool = redis.asyncio.ConnectionPool.from_url("redis://test_url")
+    status, _ = await healthpy.redis.async_check(pool, "local_my_host")
+    assert status == "pass"
+    assert clients[0] is client
+    assert clients[1].connection_pool is pool
+
+
+class PipelineMock:
+    """Execute commands against a list of keys, recording each pipeline."""
+
+    def __init__(self, keyspace: list, pipelines: list):
+        self.keyspace = keyspace
+        self.commands = []
+        pipelines.append(self.commands)
+
+    def ping(self):
+        self.commands.append(("PING",))
+
+    def exists(self, key):
+        self.commands.append(("EXISTS", key))
+
+    def scan(self, cursor, match, count):
+        self.commands.append(("SCAN", cursor, match, count))
+
+    def _execute(self, command, *args):
+        if command == "PING":
+            return True
+        if command == "EXISTS":
+            return int(args[0] in self.keyspace)
+        cursor, match, count = args
+        scanned = self.keyspace[cursor : cursor + count]
+        next_cursor = cursor + count if cursor + count < len(self.keyspace) else 0
+        return next_cursor, [key for key in scanned if fnmatch.fnmatch(key, match)]
+
+    def execute(self):
+        return [self._execute(*command) for command in self.commands]
+
+
+def test_redis_keys_health_details_ok(monkeypatch):
+    pipelines = []
+    keyspace = ["a", "b", "c", "local_1", "d", "e", "remote_1"]
+    monkeypatch.setattr(
+        redis.Redis,
+        "pipeline",
+        lambda self, transaction: PipelineMock(keyspace, pipelines),
+    )
+    monkeypatch.setattr(healthpy.redis, "datetime", DateTimeMock)
+
+    assert healthpy.redis.check_keys(
+        "redis://test_url",
+        keys=["a", "d"],
+        key_patterns=["local_*", "remote_*"],
+        scan_count=3,
+    ) == (
+        "pass",
+        {
+            "redis:ping": {
+                "componentType": "component",
+                "observedValue": {
+                    "a": "pass",
+                    "d": "pass",
+                    "local_*": "pass",
+                    "remote_*": "pass",
+                },
+                "status": "pass",
+                "time": "2018-10-11T15:05:05.663979",
+            }
+        },
+    )
+    assert pipelines == [
+        [
+            ("PING",),
+            ("EXISTS", "a"),
+            ("EXISTS", "d"),
+            ("SCAN", 0, "local_*", 3),
+            ("SCAN", 0, "remote_*", 3),
+        ],
+        [("SCAN", 3, "local_*", 3), ("SCAN", 3, "remote_*", 3)],
+        [("SCAN", 6, "remote_*", 3)],
+    ]
+
+
+def test_redis_keys_health_details_missing_keys(monkeypatch):
+    pipelines = []
+    keyspace = ["a", "b", "local_1"]
+    monkeypatch.setattr(
+        redis.Redis,
+        "pipeline",
+        lambda self, transaction: PipelineMock(keyspace, pipelines),
+    )
+    monkeypatch.setattr(healthpy.redis, "datetime", DateTimeMock)
+
+    assert healthpy.redis.check_keys(
+        "redis://test_url",
+        keys=["a", "z"],
+        key_patterns=["local_*", "remote_*"],
+        additional_keys={"custom": "test"},
+    ) == (
+        "fail",
+        {
+            "redis:ping": {
+                "componentType": "component",
+                "observedValue": {
+                    "a": "pass",
+                    "z": "fail",
+                    "local_*": "pass",
+                    "remote_*": "fail",
+                },
+                "output": "z, remote_* cannot be found.",
+                "status": "fail",
+                "time": "2018-10-11T15:05:05.663979",
+                "custom": "test",
+            }
+        },
+    )
+    assert len(pipelines) == 1
+
+
+def test_redis_keys_health_details_cannot_connect_to_redis(monkeypatch):
+    def fail_execute(*args):
+        raise redis.exceptions.ConnectionError("Test message")
+
+    monkeypatch.setattr(redis.client.Pipeline, "execute", fail_execute)
+    monkeypatch.setattr(healthpy.redis, "datetime", DateTimeMock)
+
+    assert healthpy.redis.check_keys("redis://test_url", keys=["a"]) == (
+        "fail",
+        {
+            "redis:ping": {
+                "componentType": "component",
+                "output": "Test message",
+                "status": "fail",
+                "time": "2018-10-11T15:05:05.663979",
+            }
+        },
+    )
+
+
+def test_redis_health_details_latency(monkeypatch):
+    monkeypatch.setattr(redis.Redis, "ping", lambda *args: 1)
+    monkeypatch.setattr(redis.Redis, "keys", lambda *args: ["local"])
+    monkeypatch.setattr(healthpy.redis, "datetime", DateTimeMock)
+    monkeypatch.setattr(healthpy._latency, "_elapsed", lambda start: 12.5)
+
+    status, details = healthpy.redis.check(
+        "redis://test_url", "local_my_host", measure_latency=True
+    )
+    assert status == "pass"
+    assert details == {
+        "redis:ping": {
+            "componentType": "component",
+            "observedValue": "local_my_host can be found.",
+            "status": "pass",
+            "time": "2018-10-11T15:05:05.663979",
+            "latency": 12.5,
+        }
+    }
+
+
+def test_redis_health_details_latency_above_threshold(monkeypatch):
+    monkeypatch.setattr(redis.Redis, "ping", lambda *args: 1)
+    monkeypatch.setattr(redis.Redis, "keys", lambda *args: ["local"])
+    monkeypatch.setattr(healthpy.redis, "datetime", DateTimeMock)
+    monkeypatch.setattr(healthpy._latency, "_elapsed", lambda start: 12.5)
+
+    status, details = healthpy.redis.check(
+        "redis://test_url", "local_my_host", latency_threshold=10
+    )
+    assert status == "warn"
+    assert details == {
+        "redis:ping": {
+            "componentType": "component",
+            "observedValue": "local_my_host can be found.",
+            "output": "Response took more than 10 ms.",
+            "status": "warn",
+            "time": "2018-10-11T15:05:05.663979",
+            "latency": 12.5,
+        }
+    }
+
+
+def test_redis_health_details_failure_above_latency_threshold(monkeypatch):
+    def fail_ping(*args):
+        raise redis.exceptions.ConnectionError("Timeout")
+
+    monkeypatch.setattr(redis.Redis, "ping", fail_ping)
+    monkeypatch.setattr(healthpy.redis, "datetime", DateTimeMock)
+    monkeypatch.setattr(healthpy._latency, "_elapsed", lambda start: 1000)
+
+    status, details = healthpy.redis.check(
+        "redis://test_url", "local_my_host", latency_threshold=10
+    )
+    assert status == "fail"
+    assert details["redis:ping"]["output"] == "Timeout"
+    assert details["redis:ping"]["latency"] == 1000
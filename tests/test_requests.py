@@ -3,6 +3,7 @@ import json
 from responses import RequestsMock
 import requests
 
+import healthpy._latency
 import healthpy.requests
 from healthpy.testing import mock_http_health_datetime
 
@@ -713,3 +714,185 @@ def test_show_affected_endpoints_when_request_failed_404(
             }
         },
     )
+
+
+def test_reuse_connections(
+    monkeypatch, mock_http_health_datetime, responses: RequestsMock
+):
+    sessions = []
+    monkeypatch.setattr(
+        healthpy.requests._sessions,
+        "_create",
+        lambda: sessions.append(requests.Session()) or sessions[-1],
+    )
+    responses.add(
+        url="http://test/health",
+        method=responses.GET,
+        status=200,
+        json={"status": "pass"},
+        content_type="application/health+json",
+    )
+    responses.add(
+        url="http://test/status",
+        method=responses.GET,
+        status=200,
+        json={"status": "warn"},
+        content_type="application/health+json",
+    )
+    assert healthpy.requests.check(
+        "tests", "http://test/health", reuse_connections=True
+    ) == (
+        "pass",
+        {
+            "tests:health": {
+                "componentType": "http://test/health",
+                "observedValue": {"status": "pass"},
+                "status": "pass",
+                "time": "2018-10-11T15:05:05.663979",
+            }
+        },
+    )
+    assert healthpy.requests.check(
+        "tests", "http://test/status", reuse_connections=True
+    ) == (
+        "warn",
+        {
+            "tests:health": {
+                "componentType": "http://test/status",
+                "observedValue": {"status": "warn"},
+                "status": "warn",
+                "time": "2018-10-11T15:05:05.663979",
+            }
+        },
+    )
+    assert len(sessions) == 1
+
+    healthpy.requests.close()
+    assert healthpy.requests._sessions.pop() == []
+
+
+def test_circuit_breaker(mock_http_health_datetime, responses: RequestsMock):
+    breaker = healthpy.CircuitBreaker(failure_threshold=1, open_duration=60)
+    responses.add(
+        url="http://test/health",
+        method=responses.GET,
+        status=500,
+        body="down",
+        content_type="text/plain",
+    )
+    failing = healthpy.requests.check(
+        "tests", "http://test/health", circuit_breaker=breaker
+    )
+    assert failing == (
+        "fail",
+        {
+            "tests:health": {
+                "componentType": "http://test/health",
+                "output": "down",
+                "status": "fail",
+                "time": "2018-10-11T15:05:05.663979",
+                "circuitBreaker": "open",
+            }
+        },
+    )
+    assert (
+        healthpy.requests.check("tests", "http://test/health", circuit_breaker=breaker)
+        == failing
+    )
+    assert len(responses.calls) == 1
+
+
+def test_latency_below_threshold(
+    mock_http_health_datetime, responses: RequestsMock, monkeypatch
+):
+    monkeypatch.setattr(healthpy._latency, "_elapsed", lambda start: 50.0)
+    responses.add(
+        url="http://test/health",
+        method=responses.GET,
+        status=200,
+        json={"status": "pass"},
+        content_type="application/health+json",
+    )
+    assert healthpy.requests.check(
+        "tests", "http://test/health", latency_threshold=100
+    ) == (
+        "pass",
+        {
+            "tests:health": {
+                "componentType": "http://test/health",
+                "observedValue": {"status": "pass"},
+                "status": "pass",
+                "time": "2018-10-11T15:05:05.663979",
+                "latency": 50.0,
+            }
+        },
+    )
+
+
+def test_max_body_size_truncated(mock_http_health_datetime, responses: RequestsMock):
+    responses.add(
+        url="http://test/health",
+        method=responses.GET,
+        status=500,
+        body="<html>" + "a" * 10000 + "</html>",
+        content_type="text/html",
+    )
+    assert healthpy.requests.check("tests", "http://test/health", max_body_size=10) == (
+        "fail",
+        {
+            "tests:health": {
+                "componentType": "http://test/health",
+                "output": "<html>aaaa",
+                "status": "fail",
+                "time": "2018-10-11T15:05:05.663979",
+                "truncated": True,
+            }
+        },
+    )
+
+
+def test_max_body_size_truncated_json(
+    mock_http_health_datetime, responses: RequestsMock
+):
+    responses.add(
+        url="http://test/health",
+        method=responses.GET,
+        status=500,
+        json={"checks": {"a": "b"}, "status": "warn", "details": "a" * 10000},
+        content_type="application/health+json",
+    )
+    assert healthpy.requests.check("tests", "http://test/health", max_body_size=50) == (
+        "warn",
+        {
+            "tests:health": {
+                "componentType": "http://test/health",
+                "output": '{"checks": {"a": "b"}, "status": "warn", "details"',
+                "status": "warn",
+                "time": "2018-10-11T15:05:05.663979",
+                "truncated": True,
+            }
+        },
+    )
+
+
+def test_max_body_size_not_reached(mock_http_health_datetime, responses: RequestsMock):
+    responses.add(
+        url="http://test/health",
+        method=responses.GET,
+        status=200,
+        json={"status": "pass"},
+        content_type="application/health+json",
+    )
+    assert healthpy.requests.check(
+        "tests", "http://test/health", max_body_size=100
+    ) == (
+        "pass",
+        {
+            "tests:health": {
+                "componentType": "http://test/health",
+                "observedValue": {"status": "pass"},
+                "status": "pass",
+                "time": "2018-10-11T15:05:05.663979",
+            }
+        },
+    )
@@ -1,4 +1,8 @@
+import json
+
 import healthpy
+from healthpy import _response
+from healthpy._response import _ResponseBody, _details_requested, _etag_matches
 
 
 def test_default_pass_response_body():
@@ -124,3 +128,201 @@ def test_fail_consul_response_status_code():
 
 def test_unknown_consul_response_status_code():
     assert healthpy.consul_response_status_code("unknown") == 200
+
+
+def test_encoded_response_body_checks():
+    body = _ResponseBody(
+        None, release_id="1.2.3", service_id="test", links={"self": "/"}
+    )
+    encoded = body.checks("pass", {"test:health": {"status": "pass"}})
+    assert json.loads(encoded.body) == {
+        "status": "pass",
+        "checks": {"test:health": {"status": "pass"}},
+        "releaseId": "1.2.3",
+        "version": "1",
+        "serviceId": "test",
+        "links": {"self": "/"},
+    }
+    assert encoded.etag.startswith('W/"')
+
+
+def test_encoded_response_body_output():
+    body = _ResponseBody(None, release_id="1.2.3")
+    encoded = body.output("fail", "failure explanation")
+    assert json.loads(encoded.body) == {
+        "status": "fail",
+        "output": "failure explanation",
+        "releaseId": "1.2.3",
+        "version": "1",
+    }
+    assert encoded.etag != body.output("fail", "other failure").etag
+
+
+def test_encoded_response_body_without_static_fields():
+    body = _ResponseBody(None)
+    encoded = body.checks("warn", {})
+    assert json.loads(encoded.body) == {"status": "warn", "checks": {}}
+
+
+def test_encoded_response_body_is_reused_for_same_result():
+    body = _ResponseBody(None, release_id="1.2.3")
+    checks = {"test:health": {"status": "pass"}}
+    encoded = body.checks("pass", checks).body
+    assert body.checks("pass", checks).body is encoded
+    assert body.checks("pass", {"test:health": {"status": "pass"}}).body == encoded
+    assert body.checks("warn", checks).body is not encoded
+    assert json.loads(body.checks("warn", checks).body)["status"] == "warn"
+    assert body.checks("warn", {"test:health": {"status": "warn"}}).body is not encoded
+
+
+def test_encoded_response_body_is_not_reused_for_another_snapshot():
+    body = _ResponseBody(None)
+    encoded = body.checks("pass", {"test:health": {"status": "pass"}})
+    other = body.checks("pass", {"test:health": {"status": "warn"}})
+    assert json.loads(other.body)["checks"] == {"test:health": {"status": "warn"}}
+    assert other.etag != encoded.etag
+
+
+def test_etag_does_not_require_encoded_body():
+    encoded_bodies = []
+
+    def serializer(body: dict) -> bytes:
+        encoded_bodies.append(body)
+        return json.dumps(body).encode()
+
+    body = _ResponseBody(serializer)
+    encoded = body.checks("pass", {"test:health": {"status": "pass"}})
+    assert encoded.etag.startswith('W/"')
+    assert not encoded_bodies
+    assert json.loads(encoded.body)["status"] == "pass"
+    assert encoded.body is encoded.body
+    assert len(encoded_bodies) == 1
+
+
+def test_etag_ignores_volatile_keys():
+    body = _ResponseBody(None, release_id="1.2.3")
+    etag = body.checks(
+        "pass",
+        {
+            "test:health": {
+                "status": "pass",
+                "time": "2018-10-11T15:05:05.663979",
+                "observedValue": {"checks": [{"time": "2018-10-11T15:05:05"}]},
+            },
+            "other:health": {"status": "pass", "cacheAge": 1.2},
+        },
+    ).etag
+    assert (
+        body.checks(
+            "pass",
+            {
+                "test:health": {
+                    "status": "pass",
+                    "time": "2019-10-11T15:05:05.663979",
+                    "observedValue": {"checks": [{"time": "2019-10-11T15:05:05"}]},
+                },
+                "other:health": {"status": "pass", "cacheAge": 3.4},
+            },
+        ).etag
+        == etag
+    )
+    assert (
+        body.checks(
+            "warn",
+            {
+                "test:health": {
+                    "status": "pass",
+                    "time": "2019-10-11T15:05:05.663979",
+                    "observedValue": {"checks": [{"time": "2019-10-11T15:05:05"}]},
+                },
+                "other:health": {"status": "warn", "cacheAge": 3.4},
+            },
+        ).etag
+        != etag
+    )
+    assert _ResponseBody(None, release_id="1.2.4").checks("pass", {}).etag != (
+        _ResponseBody(None, release_id="1.2.3").checks("pass", {}).etag
+    )
+
+
+def test_etag_does_not_ignore_volatile_keys_within_values():
+    body = _ResponseBody(None)
+    etag = body.checks(
+        "pass", {"test:health": {"status": "pass", "output": '"time": "1"'}}
+    ).etag
+    assert (
+        body.checks(
+            "pass", {"test:health": {"status": "pass", "output": '"time": "2"'}}
+        ).etag
+        != etag
+    )
+
+
+def test_etag_matches():
+    assert not _etag_matches(None, 'W/"abc"')
+    assert not _etag_matches("", 'W/"abc"')
+    assert not _etag_matches('W/"abd"', 'W/"abc"')
+    assert _etag_matches('W/"abc"', 'W/"abc"')
+    assert _etag_matches('"abc"', 'W/"abc"')
+    assert _etag_matches('"abd", W/"abc"', 'W/"abc"')
+    assert _etag_matches(" * ", 'W/"abc"')
+
+
+def test_orjson_is_the_default_serializer():
+    assert _response._default_serializer is _response._orjson_serializer
+    assert _response._orjson_serializer({"status": "pass", "checks": {1: "é"}}) == (
+        '{"status":"pass","checks":{"1":"é"}}'.encode()
+    )
+
+
+def test_json_serializer():
+    assert _response._json_serializer({"status": "pass", "checks": {1: "é"}}) == (
+        b'{"status": "pass", "checks": {"1": "\\u00e9"}}'
+    )
+
+
+def test_encoded_response_body_custom_serializer():
+    body = _ResponseBody(
+        lambda body: json.dumps(body, sort_keys=True, indent=None).encode(),
+        release_id="1.2.3",
+    )
+    assert body.checks("pass", {"b": {}, "a": {}}).body == (
+        b'{"checks": {"a": {}, "b": {}}, "releaseId": "1.2.3", "status": "pass", '
+        b'"version": "1"}'
+    )
+
+
+def test_encoded_response_body_str_serializer():
+    body = _ResponseBody(lambda body: json.dumps(body) + "\n", release_id="1.2.3")
+    encoded = body.checks("pass", {"test:health": {"status": "pass"}}).body
+    assert isinstance(encoded, bytes)
+    assert json.loads(encoded) == {
+        "status": "pass",
+        "checks": {"test:health": {"status": "pass"}},
+        "releaseId": "1.2.3",
+        "version": "1",
+    }
+    assert json.loads(body.status("warn")) == {
+        "status": "warn",
+        "releaseId": "1.2.3",
+        "version": "1",
+    }
+
+
+def test_encoded_response_body_status_only():
+    body = _ResponseBody(None, release_id="1.2.3")
+    encoded = body.status("warn")
+    assert json.loads(encoded) == {
+        "status": "warn",
+        "releaseId": "1.2.3",
+        "version": "1",
+    }
+    assert body.status("warn") is encoded
+
+
+def test_details_requested():
+    assert _details_requested(None)
+    assert _details_requested("true")
+    assert not _details_requested("false")
+    assert not _details_requested("False")
+    assert not _details_requested("0")
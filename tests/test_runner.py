@@ -0,0 +1,659 @@
+import asyncio
+import concurrent.futures
+import functools
+import threading
+import time
+
+import pytest
+
+import healthpy
+import healthpy._runner
+from healthpy.testing import DateTimeModuleMock
+
+
+@pytest.fixture
+def mock_runner_datetime(monkeypatch):
+    monkeypatch.setattr(healthpy._runner, "datetime", DateTimeModuleMock)
+
+
+async def async_check(name: str, status: str, delay: float = 0):
+    await asyncio.sleep(delay)
+    return status, {f"{name}:health": {"status": status}}
+
+
+def sync_check(name: str, status: str, delay: float = 0):
+    time.sleep(delay)
+    return status, {
+        f"{name}:health": {"status": status, "thread": threading.current_thread().name}
+    }
+
+
+@pytest.mark.asyncio
+async def test_without_checks():
+    assert await healthpy.run_checks({}) == ("pass", {})
+
+
+@pytest.mark.asyncio
+async def test_async_and_sync_checks_are_aggregated():
+    status, checks = await healthpy.run_checks(
+        {
+            "first": functools.partial(async_check, "first", "pass"),
+            "second": functools.partial(sync_check, "second", "warn"),
+            "third": functools.partial(async_check, "third", "pass"),
+        }
+    )
+    assert status == "warn"
+    assert checks == {
+        "first:health": {"status": "pass"},
+        "second:health": {
+            "status": "warn",
+            "thread": checks["second:health"]["thread"],
+        },
+        "third:health": {"status": "pass"},
+    }
+    assert checks["second:health"]["thread"].startswith("healthpy")
+
+
+@pytest.mark.asyncio
+async def test_checks_are_performed_concurrently():
+    start = time.monotonic()
+    status, checks = await healthpy.run_checks(
+        {
+            "first": functools.partial(async_check, "first", "pass", 0.2),
+            "second": functools.partial(sync_check, "second", "pass", 0.2),
+            "third": functools.partial(async_check, "third", "fail", 0.2),
+            "fourth": functools.partial(sync_check, "fourth", "pass", 0.2),
+        }
+    )
+    assert time.monotonic() - start < 0.6
+    assert status == "fail"
+    assert len(checks) == 4
+
+
+@pytest.mark.asyncio
+async def test_check_timeout(mock_runner_datetime):
+    assert await healthpy.run_checks(
+        {
+            "fast": functools.partial(async_check, "fast", "pass"),
+            "slow": functools.partial(async_check, "slow", "pass", 1),
+            "slow_sync": functools.partial(sync_check, "slow_sync", "pass", 0.5),
+        },
+        timeout=0.1,
+    ) == (
+        "fail",
+        {
+            "fast:health": {"status": "pass"},
+            "slow": {
+                "status": "fail",
+                "time": "2018-10-11T15:05:05.663979",
+                "output": "Check did not complete within 0.1 seconds.",
+            },
+            "slow_sync": {
+                "status": "fail",
+                "time": "2018-10-11T15:05:05.663979",
+                "output": "Check did not complete within 0.1 seconds.",
+            },
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_check_timeout_starts_once_performed_by_a_thread():
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        status, checks = await healthpy.run_checks(
+            {
+                "first": functools.partial(sync_check, "first", "pass", 0.6),
+                "second": functools.partial(sync_check, "second", "pass", 0.6),
+            },
+            timeout=1,
+            executor=executor,
+        )
+    assert status == "pass"
+    assert list(checks) == ["first:health", "second:health"]
+
+
+@pytest.mark.asyncio
+async def test_check_timeout_once_performed_by_a_thread(mock_runner_datetime):
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        status, checks = await healthpy.run_checks(
+            {
+                "first": functools.partial(sync_check, "first", "pass", 0.3),
+                "second": functools.partial(sync_check, "second", "pass", 0.6),
+            },
+            timeout=0.4,
+            executor=executor,
+        )
+    assert status == "fail"
+    assert checks["first:health"]["status"] == "pass"
+    assert checks["second"] == {
+        "status": "fail",
+        "time": "2018-10-11T15:05:05.663979",
+        "output": "Check did not complete within 0.4 seconds.",
+    }
+
+
+@pytest.mark.asyncio
+async def test_deadline():
+    with pytest.raises(asyncio.TimeoutError) as exception_info:
+        await healthpy.run_checks(
+            {
+                "fast": functools.partial(async_check, "fast", "pass"),
+                "slow": functools.partial(async_check, "slow", "pass", 1),
+            },
+            deadline=0.1,
+        )
+    assert (
+        str(exception_info.value) == "1 check(s) did not complete within 0.1 seconds."
+    )
+
+
+@pytest.mark.asyncio
+async def test_check_failure_is_propagated():
+    async def failing():
+        raise Exception("failure explanation")
+
+    with pytest.raises(Exception, match="failure explanation"):
+        await healthpy.run_checks(
+            {"fast": functools.partial(async_check, "fast", "pass"), "failing": failing}
+        )
+
+
+def test_sync_without_checks():
+    assert healthpy.run_sync_checks({}) == ("pass", {})
+
+
+def test_sync_checks_are_performed_concurrently():
+    start = time.monotonic()
+    status, checks = healthpy.run_sync_checks(
+        {
+            "first": functools.partial(sync_check, "first", "pass", 0.2),
+            "second": functools.partial(sync_check, "second", "warn", 0.2),
+            "third": functools.partial(sync_check, "third", "pass", 0.2),
+        }
+    )
+    assert time.monotonic() - start < 0.4
+    assert status == "warn"
+    assert list(checks) == ["first:health", "second:health", "third:health"]
+    assert all(check["thread"].startswith("healthpy") for check in checks.values())
+
+
+def test_sync_check_timeout(mock_runner_datetime):
+    status, checks = healthpy.run_sync_checks(
+        {
+            "fast": functools.partial(sync_check, "fast", "pass"),
+            "slow": functools.partial(sync_check, "slow", "pass", 0.5),
+        },
+        timeout=0.1,
+        deadline=1,
+    )
+    assert status == "fail"
+    assert checks["slow"] == {
+        "status": "fail",
+        "time": "2018-10-11T15:05:05.663979",
+        "output": "Check did not complete within 0.1 seconds.",
+    }
+    assert checks["fast:health"]["status"] == "pass"
+
+
+def test_sync_check_timeout_starts_once_performed_by_a_thread():
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        status, checks = healthpy.run_sync_checks(
+            {
+                "first": functools.partial(sync_check, "first", "pass", 0.6),
+                "second": functools.partial(sync_check, "second", "pass", 0.6),
+            },
+            timeout=1,
+            executor=executor,
+        )
+    assert status == "pass"
+    assert list(checks) == ["first:health", "second:health"]
+
+
+def test_sync_check_timeout_once_performed_by_a_thread(mock_runner_datetime):
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        status, checks = healthpy.run_sync_checks(
+            {
+                "first": functools.partial(sync_check, "first", "pass", 0.3),
+                "second": functools.partial(sync_check, "second", "pass", 0.6),
+            },
+            timeout=0.4,
+            executor=executor,
+        )
+    assert status == "fail"
+    assert checks["first:health"]["status"] == "pass"
+    assert checks["second"] == {
+        "status": "fail",
+        "time": "2018-10-11T15:05:05.663979",
+        "output": "Check did not complete within 0.4 seconds.",
+    }
+
+
+def test_sync_deadline():
+    with pytest.raises(concurrent.futures.TimeoutError) as exception_info:
+        healthpy.run_sync_checks(
+            {
+                "fast": functools.partial(sync_check, "fast", "pass"),
+                "slow": functools.partial(sync_check, "slow", "pass", 0.5),
+            },
+            timeout=1,
+            deadline=0.1,
+        )
+    assert (
+        str(exception_info.value) == "1 check(s) did not complete within 0.1 seconds."
+    )
+
+
+def test_sync_check_failure_is_propagated():
+    def failing():
+        raise Exception("failure explanation")
+
+    with pytest.raises(Exception, match="failure explanation"):
+        healthpy.run_sync_checks({"failing": failing})
+
+
+@pytest.mark.asyncio
+async def test_partial_results_on_deadline(mock_runner_datetime):
+    async def failing():
+        raise Exception("failure explanation")
+
+    status, checks = await healthpy.run_checks(
+        {
+            "fast": functools.partial(async_check, "fast", "pass"),
+            "slow": functools.partial(async_check, "slow", "pass", 1),
+            "failing": failing,
+        },
+        deadline=0.1,
+        partial_results=True,
+        timeout_status="warn",
+    )
+    assert status == "fail"
+    assert checks == {
+        "fast:health": {"status": "pass"},
+        "slow": {
+            "status": "warn",
+            "time": "2018-10-11T15:05:05.663979",
+            "output": "Check did not complete within 0.1 seconds.",
+        },
+        "failing": {
+            "status": "fail",
+            "time": "2018-10-11T15:05:05.663979",
+            "output": "failure explanation",
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_partial_results_timeout_status(mock_runner_datetime):
+    status, checks = await healthpy.run_checks(
+        {
+            "fast": functools.partial(async_check, "fast", "pass"),
+            "slow": functools.partial(async_check, "slow", "pass", 1),
+        },
+        timeout=0.1,
+        partial_results=True,
+        timeout_status="warn",
+    )
+    assert status == "warn"
+    assert checks["slow"]["output"] == "Check did not complete within 0.1 seconds."
+
+
+def test_sync_partial_results_on_deadline(mock_runner_datetime):
+    def failing():
+        raise Exception("failure explanation")
+
+    status, checks = healthpy.run_sync_checks(
+        {
+            "fast": functools.partial(sync_check, "fast", "pass"),
+            "slow": functools.partial(sync_check, "slow", "pass", 0.5),
+            "failing": failing,
+        },
+        timeout=1,
+        deadline=0.1,
+        partial_results=True,
+        timeout_status="warn",
+    )
+    assert status == "fail"
+    assert checks.pop("fast:health")["status"] == "pass"
+    assert checks == {
+        "slow": {
+            "status": "warn",
+            "time": "2018-10-11T15:05:05.663979",
+            "output": "Check did not complete within 0.1 seconds.",
+        },
+        "failing": {
+            "status": "fail",
+            "time": "2018-10-11T15:05:05.663979",
+            "output": "failure explanation",
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_fail_fast(mock_runner_datetime):
+    start = time.perf_counter()
+    status, checks = await healthpy.run_checks(
+        {
+            "failing": functools.partial(async_check, "failing", "fail", 0.05),
+            "slow": functools.partial(async_check, "slow", "pass", 5),
+        },
+        fail_fast=True,
+    )
+    assert time.perf_counter() - start < 1
+    assert status == "fail"
+    assert checks == {
+        "failing:health": {"status": "fail"},
+        "slow": {
+            "status": "warn",
+            "time": "2018-10-11T15:05:05.663979",
+            "output": "Check was cancelled as failing failed.",
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_fail_fast_ignores_non_critical_checks():
+    status, checks = await healthpy.run_checks(
+        {
+            "failing": functools.partial(async_check, "failing", "fail"),
+            "slow": functools.partial(async_check, "slow", "warn", 0.1),
+        },
+        fail_fast=True,
+        critical=["slow"],
+    )
+    assert status == "fail"
+    assert checks == {
+        "failing:health": {"status": "fail"},
+        "slow:health": {"status": "warn"},
+    }
+
+
+@pytest.mark.asyncio
+async def test_fail_fast_ignores_non_critical_policies():
+    status, checks = await healthpy.run_checks(
+        {
+            "cache": functools.partial(async_check, "cache", "fail"),
+            "db": functools.partial(async_check, "db", "fail", 0.2),
+        },
+        fail_fast=True,
+        policies={"cache": healthpy.CheckPolicy(critical=False)},
+    )
+    assert status == "fail"
+    assert checks == {
+        "cache:health": {"status": "fail"},
+        "db:health": {"status": "fail"},
+    }
+
+
+@pytest.mark.asyncio
+async def test_fail_fast_once_group_fails(mock_runner_datetime):
+    status, checks = await healthpy.run_checks(
+        {
+            "replica1": functools.partial(async_check, "replica1", "fail"),
+            "replica2": functools.partial(async_check, "replica2", "fail", 0.05),
+            "replica3": functools.partial(async_check, "replica3", "pass", 5),
+        },
+        fail_fast=True,
+        policies={
+            "replica1": healthpy.CheckPolicy(group="replicas"),
+            "replica2": healthpy.CheckPolicy(group="replicas"),
+            "replica3": healthpy.CheckPolicy(group="replicas"),
+        },
+        groups={"replicas": 2},
+    )
+    assert status == "fail"
+    assert checks == {
+        "replica1:health": {"status": "fail"},
+        "replica2:health": {"status": "fail"},
+        "replica3": {
+            "status": "warn",
+            "time": "2018-10-11T15:05:05.663979",
+            "output": "Check was cancelled as replica2 failed.",
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_fail_fast_on_exception():
+    async def failing():
+        raise Exception("failure explanation")
+
+    status, checks = await healthpy.run_checks(
+        {
+            "failing": failing,
+            "slow": functools.partial(async_check, "slow", "pass", 5),
+        },
+        fail_fast=True,
+        partial_results=True,
+    )
+    assert status == "fail"
+    assert checks["failing"]["output"] == "failure explanation"
+    assert checks["slow"]["output"] == "Check was cancelled as failing failed."
+
+
+def test_sync_fail_fast(mock_runner_datetime):
+    release = threading.Event()
+
+    def blocked():
+        release.wait()
+        return "pass", {"blocked:health": {"status": "pass"}}
+
+    try:
+        status, checks = healthpy.run_sync_checks(
+            {
+                "failing": functools.partial(sync_check, "failing", "fail", 0.05),
+                "blocked": blocked,
+            },
+            fail_fast=True,
+        )
+    finally:
+        release.set()
+    assert status == "fail"
+    assert checks.pop("failing:health")["status"] == "fail"
+    assert checks == {
+        "blocked": {
+            "status": "warn",
+            "time": "2018-10-11T15:05:05.663979",
+            "output": "Check was cancelled as failing failed.",
+        }
+    }
+
+
+def test_sync_fail_fast_on_timeout(mock_runner_datetime):
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        status, checks = healthpy.run_sync_checks(
+            {
+                "slow": functools.partial(sync_check, "slow", "pass", 0.3),
+                "queued": functools.partial(sync_check, "queued", "pass"),
+            },
+            timeout=0.1,
+            executor=executor,
+            fail_fast=True,
+        )
+    assert status == "fail"
+    assert checks == {
+        "slow": {
+            "status": "fail",
+            "time": "2018-10-11T15:05:05.663979",
+            "output": "Check did not complete within 0.1 seconds.",
+        },
+        "queued": {
+            "status": "warn",
+            "time": "2018-10-11T15:05:05.663979",
+            "output": "Check was cancelled as slow failed.",
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_policies():
+    status, checks = await healthpy.run_checks(
+        {
+            "db": functools.partial(async_check, "db", "pass"),
+            "cache": functools.partial(async_check, "cache", "fail"),
+        },
+        policies={"cache": healthpy.CheckPolicy(critical=False)},
+    )
+    assert status == "warn"
+
+
+def test_sync_policies():
+    status, checks = healthpy.run_sync_checks(
+        {
+            "replica1": functools.partial(sync_check, "replica1", "fail"),
+            "replica2": functools.partial(sync_check, "replica2", "pass"),
+        },
+        policies={
+            "replica1": healthpy.CheckPolicy(group="replicas"),
+            "replica2": healthpy.CheckPolicy(group="replicas"),
+        },
+        groups={"replicas": 2},
+    )
+    assert status == "warn"
+
+
+@pytest.mark.asyncio
+async def test_dependencies(mock_runner_datetime):
+    performed = []
+
+    def tracked(name: str, status: str):
+        async def check():
+            performed.append(name)
+            return await async_check(name, status)
+
+        return check
+
+    status, checks = await healthpy.run_checks(
+        {
+            "endpoint": tracked("endpoint", "pass"),
+            "redis": tracked("redis", "fail"),
+            "database": tracked("database", "pass"),
+            "cache endpoint": tracked("cache endpoint", "pass"),
+            "report": tracked("report", "pass"),
+        },
+        dependencies={
+            "cache endpoint": ["redis"],
+            "report": ["cache endpoint", "database"],
+            "endpoint": ["database"],
+        },
+    )
+    assert status == "fail"
+    assert performed == ["redis", "database", "endpoint"]
+    assert checks == {
+        "endpoint:health": {"status": "pass"},
+        "redis:health": {"status": "fail"},
+        "database:health": {"status": "pass"},
+        "cache endpoint": {
+            "status": "fail",
+            "time": "2018-10-11T15:05:05.663979",
+            "output": "Check was skipped as redis failed.",
+            "skipped": True,
+        },
+        "report": {
+            "status": "fail",
+            "time": "2018-10-11T15:05:05.663979",
+            "output": "Check was skipped as cache endpoint failed.",
+            "skipped": True,
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_dependencies_on_non_critical_check(mock_runner_datetime):
+    status, checks = await healthpy.run_checks(
+        {
+            "cache": functools.partial(async_check, "cache", "fail"),
+            "cache endpoint": functools.partial(async_check, "cache endpoint", "pass"),
+            "report": functools.partial(async_check, "report", "pass"),
+        },
+        dependencies={"cache endpoint": ["cache"], "report": ["cache endpoint"]},
+        policies={"cache": healthpy.CheckPolicy(critical=False)},
+    )
+    assert status == "warn"
+    assert checks == {
+        "cache:health": {"status": "fail"},
+        "cache endpoint": {
+            "status": "warn",
+            "time": "2018-10-11T15:05:05.663979",
+            "output": "Check was skipped as cache failed.",
+            "skipped": True,
+        },
+        "report": {
+            "status": "warn",
+            "time": "2018-10-11T15:05:05.663979",
+            "output": "Check was skipped as cache endpoint failed.",
+            "skipped": True,
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_dependencies_fail_fast(mock_runner_datetime):
+    status, checks = await healthpy.run_checks(
+        {
+            "redis": functools.partial(async_check, "redis", "fail"),
+            "database": functools.partial(async_check, "database", "pass", 5),
+            "endpoint": functools.partial(async_check, "endpoint", "pass"),
+        },
+        dependencies={"endpoint": ["database"]},
+        fail_fast=True,
+    )
+    assert status == "fail"
+    assert checks["database"]["output"] == "Check was cancelled as redis failed."
+    assert checks["endpoint"]["output"] == "Check was cancelled as redis failed."
+
+
+@pytest.mark.asyncio
+async def test_dependencies_deadline_applies_to_all_waves():
+    with pytest.raises(asyncio.TimeoutError) as exception_info:
+        await healthpy.run_checks(
+            {
+                "first": functools.partial(async_check, "first", "pass", 0.1),
+                "second": functools.partial(async_check, "second", "pass", 0.1),
+            },
+            dependencies={"second": ["first"]},
+            deadline=0.15,
+        )
+    assert (
+        str(exception_info.value) == "1 check(s) did not complete within 0.15 seconds."
+    )
+
+
+@pytest.mark.asyncio
+async def test_circular_dependencies():
+    with pytest.raises(
+        ValueError, match="Circular dependency between checks: first, second."
+    ):
+        await healthpy.run_checks(
+            {
+                "first": functools.partial(async_check, "first", "pass"),
+                "second": functools.partial(async_check, "second", "pass"),
+            },
+            dependencies={"second": ["first"], "first": ["second"]},
+        )
+
+
+def test_sync_dependencies(mock_runner_datetime):
+    status, checks = healthpy.run_sync_checks(
+        {
+            "redis": functools.partial(sync_check, "redis", "fail"),
+            "endpoint": functools.partial(sync_check, "endpoint", "pass"),
+        },
+        dependencies={"endpoint": ["redis"]},
+    )
+    assert status == "fail"
+    assert checks["endpoint"] == {
+        "status": "fail",
+        "time": "2018-10-11T15:05:05.663979",
+        "output": "Check was skipped as redis failed.",
+        "skipped": True,
+    }
+
+
+def test_sync_unknown_dependency():
+    with pytest.raises(
+        ValueError, match="endpoint depends on unknown check\\(s\\): redis."
+    ):
+        healthpy.run_sync_checks(
+            {"endpoint": functools.partial(sync_check, "endpoint", "pass")},
+            dependencies={"endpoint": ["redis"]},
+        )
@@ -0,0 +1,119 @@
+import asyncio
+import time
+
+import pytest
+
+import healthpy
+import healthpy._runner
+from healthpy.testing import DateTimeModuleMock
+
+
+class Check:
+    def __init__(self, name: str, *statuses):
+        self.name = name
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def __call__(self):
+        status = self.statuses[min(self.calls, len(self.statuses) - 1)]
+        self.calls += 1
+        if isinstance(status, Exception):
+            raise status
+        return status, {f"{self.name}:health": {"status": status}}
+
+    async def async_call(self):
+        return self()
+
+
+def test_snapshot_before_start():
+    scheduler = healthpy.Scheduler()
+    with pytest.raises(RuntimeError, match="Checks were not performed yet."):
+        scheduler.snapshot()
+
+
+@pytest.mark.asyncio
+async def test_without_checks():
+    scheduler = healthpy.Scheduler()
+    await scheduler.astart()
+    assert await scheduler() == ("pass", {})
+    await scheduler.astop()
+
+
+@pytest.mark.asyncio
+async def test_checks_are_performed_on_start(monkeypatch):
+    monkeypatch.setattr(healthpy._runner, "datetime", DateTimeModuleMock)
+    scheduler = healthpy.Scheduler()
+    scheduler.add("first", Check("first", "pass").async_call, interval=10)
+    scheduler.add("second", Check("second", "warn"), interval=10)
+    scheduler.add(
+        "failing", Check("failing", Exception("failure explanation")), interval=10
+    )
+    await scheduler.astart()
+    try:
+        assert await scheduler() == (
+            "fail",
+            {
+                "first:health": {"status": "pass"},
+                "second:health": {"status": "warn"},
+                "failing": {
+                    "status": "fail",
+                    "time": "2018-10-11T15:05:05.663979",
+                    "output": "failure explanation",
+                },
+            },
+        )
+    finally:
+        await scheduler.astop()
+
+
+@pytest.mark.asyncio
+async def test_checks_are_refreshed_on_their_own_interval():
+    fast = Check("fast", "pass", "warn")
+    slow = Check("slow", "pass", "fail")
+    scheduler = healthpy.Scheduler()
+    scheduler.add("fast", fast.async_call, interval=0.05)
+    scheduler.add("slow", slow, interval=10)
+    await scheduler.astart()
+    try:
+        assert scheduler.snapshot()[0] == "pass"
+        await asyncio.sleep(0.1)
+        assert scheduler.snapshot() == (
+            "warn",
+            {"fast:health": {"status": "warn"}, "slow:health": {"status": "pass"}},
+        )
+        assert fast.calls >= 2
+        assert slow.calls == 1
+    finally:
+        await scheduler.astop()
+
+    calls = fast.calls
+    await asyncio.sleep(0.1)
+    assert fast.calls == calls
+
+
+def test_checks_are_scheduled_in_a_thread():
+    check = Check("tests", "pass", "fail")
+    scheduler = healthpy.Scheduler()
+    scheduler.add("tests", check, interval=0.05)
+    scheduler.start()
+    try:
+        assert scheduler.snapshot() == ("pass", {"tests:health": {"status": "pass"}})
+        time.sleep(0.1)
+        assert scheduler.snapshot() == ("fail", {"tests:health": {"status": "fail"}})
+    finally:
+        scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_policies():
+    scheduler = healthpy.Scheduler(
+        policies={"cache": healthpy.CheckPolicy(critical=False)}
+    )
+    scheduler.add("db", Check("db", "pass").async_call, interval=10)
+    scheduler.add("cache", Check("cache", "fail"), interval=10)
+    await scheduler.astart()
+    assert await scheduler() == (
+        "warn",
+        {"db:health": {"status": "pass"}, "cache:health": {"status": "fail"}},
+    )
+    await scheduler.astop()
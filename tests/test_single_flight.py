@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+import healthpy
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_are_coalesced():
+    calls = []
+
+    async def health_check():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "pass", {"tests:health": {"status": "pass"}}
+
+    coalesced = healthpy.single_flight(health_check)
+    results = await asyncio.gather(*[coalesced() for _ in range(5)])
+    assert results == [("pass", {"tests:health": {"status": "pass"}})] * 5
+    assert len(calls) == 1
+    assert coalesced.coalesced == 4
+
+
+@pytest.mark.asyncio
+async def test_sequential_calls_are_not_coalesced():
+    calls = []
+
+    async def health_check():
+        calls.append(1)
+        return "pass", {}
+
+    coalesced = healthpy.single_flight(health_check)
+    assert await coalesced() == ("pass", {})
+    assert await coalesced() == ("pass", {})
+    assert len(calls) == 2
+    assert coalesced.coalesced == 0
+
+
+@pytest.mark.asyncio
+async def test_failure_is_shared():
+    async def failing():
+        await asyncio.sleep(0.1)
+        raise Exception("failure explanation")
+
+    coalesced = healthpy.single_flight(failing)
+    results = await asyncio.gather(coalesced(), coalesced(), return_exceptions=True)
+    assert [str(result) for result in results] == ["failure explanation"] * 2
+    assert coalesced.coalesced == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_check():
+    async def health_check():
+        await asyncio.sleep(0.1)
+        return "pass", {}
+
+    coalesced = healthpy.single_flight(health_check)
+    first = asyncio.ensure_future(coalesced())
+    second = asyncio.ensure_future(coalesced())
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == ("pass", {})
@@ -1,6 +1,9 @@
+import json
+
 from starlette.applications import Starlette
 from starlette.testclient import TestClient
 
+import healthpy
 from healthpy.starlette import add_consul_health_endpoint
 
 
@@ -70,3 +73,173 @@ def test_consul_health_endpoint_failure():
             "status": "fail",
             "version": "1",
         }
+
+
+def test_consul_health_endpoint_cache():
+    calls = []
+
+    async def health_check():
+        calls.append(1)
+        return "pass", {"tests:health": {"status": "pass"}}
+
+    app = Starlette()
+    add_consul_health_endpoint(app, health_check, cache_ttl=10, release_id="1.2.3")
+    with TestClient(app) as client:
+        response = client.get("/health")
+        assert response.json()["checks"] == {"tests:health": {"status": "pass"}}
+        response = client.get("/health")
+        assert response.status_code == 200
+        assert response.json()["checks"]["tests:health"].keys() == {
+            "status",
+            "cacheAge",
+        }
+    assert len(calls) == 1
+
+
+def test_consul_health_endpoint_single_flight():
+    async def health_check():
+        return "pass", {}
+
+    app = Starlette()
+    add_consul_health_endpoint(
+        app, health_check, single_flight=True, release_id="1.2.3"
+    )
+    with TestClient(app) as client:
+        response = client.get("/health")
+        assert response.status_code == 200
+        assert response.json() == {
+            "checks": {},
+            "releaseId": "1.2.3",
+            "status": "pass",
+            "version": "1",
+        }
+
+
+def test_consul_health_endpoint_scheduler():
+    async def health_check():
+        return "warn", {"tests:health": {"status": "warn"}}
+
+    scheduler = healthpy.Scheduler()
+    scheduler.add("tests", health_check, interval=10)
+    app = Starlette(on_startup=[scheduler.astart], on_shutdown=[scheduler.astop])
+    add_consul_health_endpoint(app, scheduler, release_id="1.2.3")
+    with TestClient(app) as client:
+        response = client.get("/health")
+        assert response.status_code == 429
+        assert response.json() == {
+            "checks": {"tests:health": {"status": "warn"}},
+            "releaseId": "1.2.3",
+            "status": "warn",
+            "version": "1",
+        }
+
+
+def test_consul_health_endpoint_custom_serializer():
+    async def health_check():
+        return "pass", {}
+
+    app = Starlette()
+    add_consul_health_endpoint(
+        app,
+        health_check,
+        serializer=lambda body: json.dumps(body, indent=4).encode(),
+        release_id="1.2.3",
+    )
+    with TestClient(app) as client:
+        response = client.get("/health")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/health+json"
+        assert response.text.startswith('{\n    "status": "pass"')
+        assert response.json() == {
+            "checks": {},
+            "releaseId": "1.2.3",
+            "status": "pass",
+            "version": "1",
+        }
+
+
+def test_consul_health_endpoint_str_serializer():
+    async def health_check():
+        return "pass", {}
+
+    app = Starlette()
+    add_consul_health_endpoint(
+        app, health_check, serializer=json.dumps, release_id="1.2.3"
+    )
+    with TestClient(app) as client:
+        response = client.get("/health")
+        assert response.status_code == 200
+        assert response.json() == {
+            "checks": {},
+            "releaseId": "1.2.3",
+            "status": "pass",
+            "version": "1",
+        }
+
+
+def test_consul_health_endpoint_etag():
+    async def health_check():
+        return "pass", {"test:health": {"status": "pass", "time": "2018-10-11"}}
+
+    app = Starlette()
+    add_consul_health_endpoint(app, health_check, release_id="1.2.3")
+    with TestClient(app) as client:
+        response = client.get("/health")
+        etag = response.headers["ETag"]
+        assert etag.startswith('W/"')
+
+        response = client.get("/health", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+
+        response = client.get("/health", headers={"If-None-Match": 'W/"other"'})
+        assert response.status_code == 200
+        assert response.json()["status"] == "pass"
+
+
+def test_consul_health_endpoint_head():
+    async def health_check():
+        return "warn", {"test:health": {"status": "warn"}}
+
+    app = Starlette()
+    add_consul_health_endpoint(app, health_check, release_id="1.2.3")
+    with TestClient(app) as client:
+        response = client.head("/health")
+        assert response.status_code == 429
+        assert response.content == b""
+
+
+def test_consul_health_endpoint_without_details():
+    async def health_check():
+        return "pass", {"test:health": {"status": "pass"}}
+
+    app = Starlette()
+    add_consul_health_endpoint(app, health_check, release_id="1.2.3")
+    with TestClient(app) as client:
+        response = client.get("/health?details=false")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/health+json"
+        assert "ETag" not in response.headers
+        assert response.json() == {
+            "releaseId": "1.2.3",
+            "status": "pass",
+            "version": "1",
+        }
+        response = client.get("/health?details=true")
+        assert response.json()["checks"] == {"test:health": {"status": "pass"}}
+
+
+def test_consul_health_endpoint_failure_without_details():
+    async def health_check():
+        raise Exception("failure explanation")
+
+    app = Starlette()
+    add_consul_health_endpoint(app, health_check)
+    with TestClient(app) as client:
+        response = client.get("/health?details=0")
+        assert response.status_code == 400
+        assert response.json() == {"status": "fail"}
+        response = client.head("/health")
+        assert response.status_code == 400
+        assert response.content == b""
@@ -1,7 +1,16 @@
+import asyncio
+import json
+import threading
+
 import flask
 import flask_restx
 
-from healthpy.flask_restx import add_consul_health_endpoint, add_health_endpoint
+import healthpy
+from healthpy.flask_restx import (
+    add_consul_health_endpoint,
+    add_health_endpoint,
+    close_event_loop,
+)
 
 
 def test_health_endpoint_pass():
@@ -146,3 +155,306 @@ def test_consul_health_endpoint_failure():
             "status": "fail",
             "version": "1",
         }
+
+
+def test_health_endpoint_cache():
+    calls = []
+
+    async def health_check():
+        calls.append(1)
+        return "warn", {"tests:health": {"status": "warn"}}
+
+    app = flask.Flask(__name__)
+    api = flask_restx.Api(app)
+    add_health_endpoint(api, health_check, cache_ttl=10, release_id="1.2.3")
+    with app.test_client() as client:
+        response = client.get("/health")
+        assert response.json["checks"] == {"tests:health": {"status": "warn"}}
+        response = client.get("/health")
+        assert response.status_code == 200
+        assert response.json["checks"]["tests:health"].keys() == {
+            "status",
+            "cacheAge",
+        }
+    assert len(calls) == 1
+
+
+def test_consul_health_endpoint_cache():
+    calls = []
+
+    async def health_check():
+        calls.append(1)
+        return "warn", {"tests:health": {"status": "warn"}}
+
+    app = flask.Flask(__name__)
+    api = flask_restx.Api(app)
+    add_consul_health_endpoint(api, health_check, cache_ttl=10, release_id="1.2.3")
+    with app.test_client() as client:
+        client.get("/health")
+        response = client.get("/health")
+        assert response.status_code == 429
+        assert "cacheAge" in response.json["checks"]["tests:health"]
+    assert len(calls) == 1
+
+
+def test_health_endpoint_scheduler():
+    def health_check():
+        return "fail", {"tests:health": {"status": "fail"}}
+
+    scheduler = healthpy.Scheduler()
+    scheduler.add("tests", health_check, interval=10)
+    scheduler.start()
+    app = flask.Flask(__name__)
+    api = flask_restx.Api(app)
+    add_health_endpoint(api, scheduler, release_id="1.2.3")
+    try:
+        with app.test_client() as client:
+            response = client.get("/health")
+            assert response.status_code == 400
+            assert response.json == {
+                "checks": {"tests:health": {"status": "fail"}},
+                "releaseId": "1.2.3",
+                "status": "fail",
+                "version": "1",
+            }
+    finally:
+        scheduler.stop()
+
+
+def test_health_endpoint_persistent_event_loop():
+    loops = []
+
+    async def health_check():
+        loops.append(asyncio.get_running_loop())
+        return "pass", {}
+
+    app = flask.Flask(__name__)
+    api = flask_restx.Api(app)
+    add_health_endpoint(
+        api, health_check, persistent_event_loop=True, release_id="1.2.3"
+    )
+    try:
+        with app.test_client() as client:
+            for _ in range(2):
+                response = client.get("/health")
+                assert response.status_code == 200
+                assert response.json == {
+                    "checks": {},
+                    "releaseId": "1.2.3",
+                    "status": "pass",
+                    "version": "1",
+                }
+        assert loops[0] is loops[1]
+        assert loops[0].is_running()
+    finally:
+        cleaned = []
+
+        async def cleanup():
+            cleaned.append(asyncio.get_running_loop())
+
+        close_event_loop(cleanup)
+    assert cleaned == [loops[0]]
+    assert loops[0].is_closed()
+    # Closing an already closed event loop does nothing
+    close_event_loop(cleanup)
+    assert cleaned == [loops[0]]
+
+
+def test_consul_health_endpoint_persistent_event_loop():
+    async def health_check():
+        return "warn", {}
+
+    app = flask.Flask(__name__)
+    api = flask_restx.Api(app)
+    add_consul_health_endpoint(
+        api, health_check, persistent_event_loop=True, release_id="1.2.3"
+    )
+    try:
+        with app.test_client() as client:
+            response = client.get("/health")
+            assert response.status_code == 429
+    finally:
+        close_event_loop()
+
+
+def test_health_endpoint_without_persistent_event_loop():
+    loops = []
+
+    async def health_check():
+        loops.append(asyncio.get_running_loop())
+        return "pass", {}
+
+    app = flask.Flask(__name__)
+    api = flask_restx.Api(app)
+    add_health_endpoint(api, health_check, release_id="1.2.3")
+    with app.test_client() as client:
+        for _ in range(2):
+            client.get("/health")
+    assert loops[0] is not loops[1]
+
+
+def test_health_endpoint_sync_health_check():
+    threads = []
+
+    def health_check():
+        threads.append(threading.current_thread())
+        return healthpy.run_sync_checks(
+            {
+                "first": lambda: ("pass", {"first:health": {"status": "pass"}}),
+                "second": lambda: ("warn", {"second:health": {"status": "warn"}}),
+            }
+        )
+
+    app = flask.Flask(__name__)
+    api = flask_restx.Api(app)
+    add_health_endpoint(api, health_check, release_id="1.2.3")
+    with app.test_client() as client:
+        response = client.get("/health")
+        assert response.status_code == 200
+        assert response.json == {
+            "checks": {
+                "first:health": {"status": "pass"},
+                "second:health": {"status": "warn"},
+            },
+            "releaseId": "1.2.3",
+            "status": "warn",
+            "version": "1",
+        }
+    assert threads == [threading.current_thread()]
+
+
+def test_consul_health_endpoint_sync_health_check():
+    def health_check():
+        return "warn", {}
+
+    app = flask.Flask(__name__)
+    api = flask_restx.Api(app)
+    add_consul_health_endpoint(api, health_check, release_id="1.2.3")
+    with app.test_client() as client:
+        response = client.get("/health")
+        assert response.status_code == 429
+
+
+def test_health_endpoint_sync_health_check_failure():
+    def failing():
+        raise Exception("failure explanation")
+
+    app = flask.Flask(__name__)
+    api = flask_restx.Api(app)
+    add_health_endpoint(api, failing, release_id="1.2.3")
+    with app.test_client() as client:
+        response = client.get("/health")
+        assert response.status_code == 400
+        assert response.json == {
+            "output": "failure explanation",
+            "releaseId": "1.2.3",
+            "status": "fail",
+            "version": "1",
+        }
+
+
+def test_health_endpoint_custom_serializer():
+    def health_check():
+        return "pass", {}
+
+    app = flask.Flask(__name__)
+    api = flask_restx.Api(app)
+    add_health_endpoint(
+        api,
+        health_check,
+        serializer=lambda body: json.dumps(body, indent=4).encode(),
+        release_id="1.2.3",
+    )
+    with app.test_client() as client:
+        response = client.get("/health")
+        assert response.status_code == 200
+        assert response.content_type == "application/health+json"
+        assert response.data.startswith(b'{\n    "status": "pass"')
+        assert response.json == {
+            "checks": {},
+            "releaseId": "1.2.3",
+            "status": "pass",
+            "version": "1",
+        }
+
+
+def test_health_endpoint_etag():
+    statuses = ["pass", "pass", "warn"]
+
+    def health_check():
+        return statuses.pop(0), {"test:health": {"time": str(len(statuses))}}
+
+    app = flask.Flask(__name__)
+    api = flask_restx.Api(app)
+    add_health_endpoint(api, health_check, release_id="1.2.3")
+    with app.test_client() as client:
+        response = client.get("/health")
+        etag = response.headers["ETag"]
+        assert etag.startswith('W/"')
+
+        response = client.get("/health", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.data == b""
+        assert response.headers["ETag"] == etag
+
+        response = client.get("/health", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json["status"] == "warn"
+        assert response.headers["ETag"] != etag
+
+
+def test_consul_health_endpoint_etag():
+    def health_check():
+        return "fail", {}
+
+    app = flask.Flask(__name__)
+    api = flask_restx.Api(app)
+    add_consul_health_endpoint(api, health_check, release_id="1.2.3")
+    with app.test_client() as client:
+        etag = client.get("/health").headers["ETag"]
+        response = client.get("/health", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+
+def test_health_endpoint_head():
+    def health_check():
+        return "fail", {"test:health": {"status": "fail"}}
+
+    app = flask.Flask(__name__)
+    api = flask_restx.Api(app)
+    add_health_endpoint(api, health_check, release_id="1.2.3")
+    with app.test_client() as client:
+        response = client.head("/health")
+        assert response.status_code == 400
+        assert response.data == b""
+
+
+def test_health_endpoint_without_details():
+    def health_check():
+        return "warn", {"test:health": {"status": "warn"}}
+
+    app = flask.Flask(__name__)
+    api = flask_restx.Api(app)
+    add_health_endpoint(api, health_check, release_id="1.2.3")
+    with app.test_client() as client:
+        response = client.get("/health?details=false")
+        assert response.status_code == 200
+        assert response.content_type == "application/health+json"
+        assert "ETag" not in response.headers
+        assert response.json == {"releaseId": "1.2.3", "status": "warn", "version": "1"}
+
+
+def test_consul_health_endpoint_head():
+    def health_check():
+        raise Exception("failure explanation")
+
+    app = flask.Flask(__name__)
+    api = flask_restx.Api(app)
+    add_consul_health_endpoint(api, health_check)
+    with app.test_client() as client:
+        response = client.head("/health")
+        assert response.status_code == 400
+        assert response.data == b""
+        response = client.get("/health?details=no")
+        assert response.status_code == 400
+        assert response.json == {"status": "fail"}